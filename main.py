@@ -11,6 +11,14 @@ import logging
 import os
 from dotenv import load_dotenv
 
+# Use libuv's event loop when available (lower per-iteration overhead for
+# Telegram/Ollama I/O); falls back to the default asyncio loop otherwise
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
 from src.core.config import Config
 from src.core.plugin_manager import PluginManager
 from src.core.context_builder import ContextBuilder
@@ -40,27 +48,24 @@ async def initialize_orion():
     
     # Load config (will read OLLAMA_MODEL from env)
     config = Config('config.yaml')
-    logger.info(f"✓ Configuration loaded (v{config.get('app.version')})")
+    logger.info("✓ Configuration loaded (v%s)", config.get('app.version'))
     
     # Initialize plugin manager
     plugin_manager = PluginManager()
     logger.info("✓ Plugin manager initialized")
     
-    # Register Phase 2 storage plugins
-    await plugin_manager.register(VectorDBPlugin(), config['storage']['vector_db'])
-    logger.info("✓ VectorDBPlugin registered")
-    
-    await plugin_manager.register(ConversationBufferPlugin(), config['storage']['buffer'])
-    logger.info("✓ ConversationBufferPlugin registered")
-    
-    # Register Phase 2 retrieval plugins
-    await plugin_manager.register(CoreIdentityPlugin(), config['storage']['vault'])
-    logger.info("✓ CoreIdentityPlugin registered")
-    
-    await plugin_manager.register(VaultReaderPlugin(), config['storage']['vault'])
-    logger.info("✓ VaultReaderPlugin registered")
-    
-    # VectorSearchPlugin needs reference to VectorDBPlugin
+    # Register Phase 2 storage and retrieval plugins concurrently: their
+    # initialization (DB, model, vault files) is independent I/O.
+    # Registration order is kept, as each plugin is added before it awaits.
+    await asyncio.gather(
+        plugin_manager.register(VectorDBPlugin(), config['storage']['vector_db']),
+        plugin_manager.register(ConversationBufferPlugin(), config['storage']['buffer']),
+        plugin_manager.register(CoreIdentityPlugin(), config['storage']['vault']),
+        plugin_manager.register(VaultReaderPlugin(), config['storage']['vault']),
+    )
+    logger.info("✓ VectorDBPlugin, ConversationBufferPlugin, CoreIdentityPlugin, VaultReaderPlugin registered")
+    
+    # VectorSearchPlugin needs reference to VectorDBPlugin, so it goes second
     vector_search_config = {
         'vector_db_plugin': plugin_manager.plugins.get('vector_db'),
         'search_limit': config['context'].get('search_results', 5)
@@ -68,7 +73,7 @@ async def initialize_orion():
     await plugin_manager.register(VectorSearchPlugin(), vector_search_config)
     logger.info("✓ VectorSearchPlugin registered")
     
-    logger.info(f"✓ Registered {len(plugin_manager.plugins)} plugins")
+    logger.info("✓ Registered %d plugins", len(plugin_manager.plugins))
     
     # Initialize context builder
     context_builder = ContextBuilder(config['context'])
@@ -98,29 +103,32 @@ async def test_basic_flow():
     """Test basic message processing (for development)"""
     telegram, processor, plugin_manager = await initialize_orion()
     
-    logger.info("\n" + "="*60)
-    logger.info("ORION MVP - BASIC FLOW TEST")
-    logger.info("="*60)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("\n" + "="*60)
+        logger.info("ORION MVP - BASIC FLOW TEST")
+        logger.info("="*60)
     
     # Test message
     test_message = "Hello Orion! What can you do?"
-    logger.info(f"\nTest message: {test_message}")
+    logger.info("\nTest message: %s", test_message)
     
     try:
         response = await processor.process_message(test_message, user_id="test_user")
-        logger.info(f"\nResponse:\n{response}")
+        logger.info("\nResponse:\n%s", response)
     except Exception as e:
-        logger.error(f"Error processing message: {e}")
+        logger.error("Error processing message: %s", e)
         import traceback
         traceback.print_exc()
     
+    await processor.shutdown()
     await plugin_manager.shutdown_all()
 
 
 def main():
     """Main entry point"""
-    logger.info("Starting Orion MVP...")
-    logger.info("="*60)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Starting Orion MVP...")
+        logger.info("="*60)
     
     try:
         # Run the Telegram bot
@@ -128,7 +136,7 @@ def main():
     except KeyboardInterrupt:
         logger.info("Shutting down...")
     except Exception as e:
-        logger.error(f"Fatal error: {e}")
+        logger.error("Fatal error: %s", e)
         import traceback
         traceback.print_exc()
 
@@ -137,10 +145,11 @@ async def initialize_for_bot():
     """Initialize Orion and start bot"""
     telegram, processor, plugin_manager = await initialize_orion()
     
-    logger.info("\n" + "="*60)
-    logger.info("ORION MVP - TELEGRAM BOT RUNNING")
-    logger.info("="*60)
-    logger.info("Bot is ready to receive messages from Telegram!")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("\n" + "="*60)
+        logger.info("ORION MVP - TELEGRAM BOT RUNNING")
+        logger.info("="*60)
+        logger.info("Bot is ready to receive messages from Telegram!")
     
     # NOTE: We initialize but don't run from async context
     # The run() method will handle its own event loop
@@ -150,17 +159,27 @@ async def initialize_for_bot():
 
 # Synchronous wrapper to call the bot
 def run_bot_sync():
-    """Run bot from synchronous context"""
-    telegram, processor, plugin_manager = asyncio.run(initialize_for_bot())
+    """Run bot from synchronous context
+    
+    Initialization, polling and shutdown share one event loop instead of
+    creating and tearing down a loop for each phase.
+    """
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
     
     try:
-        # This will block until Ctrl+C
-        telegram.run()
-    except KeyboardInterrupt:
-        logger.info("Bot stopped by user")
+        telegram, processor, plugin_manager = loop.run_until_complete(initialize_for_bot())
+        
+        try:
+            # This will block until Ctrl+C (polling runs on the current loop)
+            telegram.run(close_loop=False)
+        except KeyboardInterrupt:
+            logger.info("Bot stopped by user")
+        finally:
+            # Cleanup
+            loop.run_until_complete(plugin_manager.shutdown_all())
     finally:
-        # Cleanup
-        asyncio.run(plugin_manager.shutdown_all())
+        loop.close()
 
 
 if __name__ == "__main__":
@@ -1,13 +1,28 @@
 """Configuration loader for Orion"""
 
 import os
+import json
 import yaml
 import logging
+import threading
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
+
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
 
 logger = logging.getLogger(__name__)
 
+# Resolved config file per (working directory, requested path)
+_RESOLVED_PATH_CACHE: Dict[Tuple[str, str], Path] = {}
+
+# Parsed YAML per resolved config path, keyed by (st_mtime_ns, st_size, st_ino).
+# Cached dicts are shared between Config instances and must be treated as read-only.
+_YAML_CACHE: Dict[Path, Tuple[Tuple[int, int, int], Dict[str, Any]]] = {}
+_YAML_CACHE_LOCK = threading.Lock()
+
 
 class Config:
     """Load and manage Orion configuration"""
@@ -19,6 +34,20 @@ class Config:
         Args:
             config_path: Path to config.yaml (relative to orion root)
         """
+        # Discovery depends only on cwd + input, so reuse earlier results
+        cache_key = (os.getcwd(), str(config_path))
+        self.path = _RESOLVED_PATH_CACHE.get(cache_key)
+        if self.path is None:
+            self.path = self._resolve_path(config_path)
+            _RESOLVED_PATH_CACHE[cache_key] = self.path
+        
+        self.data = {}
+        self._path_cache: Dict[str, Any] = {}
+        self.load()
+    
+    @staticmethod
+    def _resolve_path(config_path: str) -> Path:
+        """Return the first existing candidate location for config_path"""
         # Try multiple path strategies to find config
         paths_to_try = []
         
@@ -37,37 +66,106 @@ class Config:
             paths_to_try.append(Path("orion") / config_path)
         
         # Find the first path that exists
-        self.path = None
         for path in paths_to_try:
             if path.exists():
-                self.path = path
-                break
+                return path
         
-        if self.path is None:
-            raise FileNotFoundError(
-                f"Config file not found. Tried:\n" + 
-                "\n".join(f"  - {p}" for p in paths_to_try)
-            )
-        
-        self.data = {}
-        self.load()
+        raise FileNotFoundError(
+            f"Config file not found. Tried:\n" + 
+            "\n".join(f"  - {p}" for p in paths_to_try)
+        )
     
     def load(self):
         """Load configuration from file"""
         if not self.path.exists():
             raise FileNotFoundError(f"Config file not found: {self.path}")
         
-        with open(self.path, 'r') as f:
-            self.data = yaml.safe_load(f)
+        self.data = dict(self._read_yaml_cached())
+        self._path_cache = {}
         
         # Override with environment variables if present
+        # (copy the section so the shared cached dict is never mutated)
         if os.getenv('OLLAMA_MODEL'):
-            if 'llm' not in self.data:
-                self.data['llm'] = {}
+            self.data['llm'] = dict(self.data.get('llm') or {})
             self.data['llm']['model'] = os.getenv('OLLAMA_MODEL')
         
         logger.info(f"Configuration loaded from {self.path}")
     
+    def _read_yaml_cached(self) -> Dict[str, Any]:
+        """Parse the YAML file, reusing the cached result while the file is unchanged"""
+        key = self.path.resolve()
+        st = key.stat()
+        sig = (st.st_mtime_ns, st.st_size, st.st_ino)
+        
+        with _YAML_CACHE_LOCK:
+            hit = _YAML_CACHE.get(key)
+        if hit and hit[0] == sig:
+            return hit[1]
+        
+        parsed = self._read_json_sidecar(key, st)
+        if parsed is None:
+            # libyaml decodes UTF-8 itself, so hand it raw bytes
+            with open(key, 'rb') as f:
+                parsed = yaml.load(f, Loader=_YamlLoader) or {}
+            self._write_json_sidecar(key, st, parsed)
+        
+        with _YAML_CACHE_LOCK:
+            _YAML_CACHE[key] = (sig, parsed)
+        return parsed
+    
+    @staticmethod
+    def _sidecar_path(path: Path, st: os.stat_result) -> Path:
+        """JSON sidecar for a given YAML file version (e.g. config.yaml.<mtime>-<size>.json)"""
+        return path.with_name(f"{path.name}.{st.st_mtime_ns}-{st.st_size}.json")
+    
+    def _read_json_sidecar(self, path: Path, st: os.stat_result):
+        """Load the parsed config from its JSON sidecar, or None if missing/unreadable"""
+        sidecar = self._sidecar_path(path, st)
+        if not sidecar.exists():
+            return None
+        try:
+            with open(sidecar, 'rb') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.debug(f"Ignoring unreadable config cache {sidecar}: {e}")
+            return None
+    
+    def _write_json_sidecar(self, path: Path, st: os.stat_result, data: Dict[str, Any]):
+        """Atomically write the JSON sidecar and remove stale ones (best effort)"""
+        sidecar = self._sidecar_path(path, st)
+        
+        # Only cache what JSON reproduces exactly: non-str keys, tuples,
+        # sets and dates would load back different from the YAML parse
+        try:
+            encoded = json.dumps(data)
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Not caching config {path}: not JSON-serializable ({e})")
+            return
+        if json.loads(encoded) != data:
+            logger.debug(f"Not caching config {path}: it does not round-trip through JSON")
+            return
+        
+        tmp = sidecar.with_name(sidecar.name + '.tmp')
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(encoded)
+            os.replace(tmp, sidecar)
+        except OSError as e:
+            # Read-only directory
+            logger.debug(f"Could not write config cache {sidecar}: {e}")
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+            return
+        
+        for stale in path.parent.glob(f"{path.name}.*.json"):
+            if stale != sidecar:
+                try:
+                    stale.unlink()
+                except OSError:
+                    pass
+    
     def get(self, path: str, default: Any = None) -> Any:
         """
         Get config value by dot-notation path
@@ -75,7 +173,14 @@ class Config:
         Example:
             config.get('llm.model')  # Returns 'llama3.1'
             config.get('llm.missing', 'default_value')
+        
+        Resolved values are memoized per path until the next load().
         """
+        try:
+            return self._path_cache[path]
+        except KeyError:
+            pass
+        
         keys = path.split('.')
         value = self.data
         
@@ -87,8 +192,31 @@ class Config:
             else:
                 return default
         
+        self._path_cache[path] = value
         return value
     
+    def freeze(self) -> Dict[str, Any]:
+        """
+        Snapshot every dot-notation path into a flat dict
+        
+        Example:
+            flat = config.freeze()
+            flat['context.search_results']  # Same as config.get(...)
+        
+        Also primes the get() cache. The snapshot is invalidated by load().
+        """
+        def walk(prefix: str, node: Dict[str, Any]):
+            for key, value in node.items():
+                if value is None:
+                    continue
+                path = f"{prefix}.{key}" if prefix else str(key)
+                self._path_cache[path] = value
+                if isinstance(value, dict):
+                    walk(path, value)
+        
+        walk("", self.data)
+        return dict(self._path_cache)
+    
     def __getitem__(self, key: str) -> Any:
         """Dictionary-style access"""
         return self.data[key]
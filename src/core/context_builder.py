@@ -1,11 +1,55 @@
 """Context builder for system prompts"""
 
 import logging
-from typing import Dict, Any
+import time
+from io import StringIO
+from typing import Dict, Any, Mapping
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# [epoch second, formatted timestamp] - strftime runs at most once per second
+_TS_CACHE = [-1, ""]
+
+
+def _current_timestamp() -> str:
+    """Current local time as 'YYYY-MM-DD HH:MM:SS', cached per second"""
+    second = int(time.time())
+    if second != _TS_CACHE[0]:
+        _TS_CACHE[:] = [second, datetime.fromtimestamp(second).strftime("%Y-%m-%d %H:%M:%S")]
+    return _TS_CACHE[1]
+
+
+# Fixed system-prompt lines. The CRITICAL INSTRUCTIONS block must appear
+# exactly once: every copy is paid for in input tokens on each LLM call.
+_PREAMBLE_HEAD_LINES = (
+    # Base system message
+    "You are Orion, a personal cognitive augmentation assistant.",
+    "You are helpful, honest, and direct.",
+)
+
+_PREAMBLE_BODY_LINES = (
+    # Markdown formatting instructions for Telegram
+    "=== FORMATTING INSTRUCTIONS ===",
+    "You are communicating via Telegram. Use Telegram's markdown format:",
+    "- Use *single asterisks* for **bold** text",
+    "- Use _single underscores_ for _italic_ text",
+    "- Use `backticks` for `inline code`",
+    "- Use ```code blocks``` for code (no language tag needed)",
+    "- Use • (bullet) for lists, not - dashes",
+    "- Do NOT use ## or ### for headers (just use *bold* for emphasis)",
+    "- Do NOT use **double asterisks** or __double underscores__",
+    "=== END FORMATTING INSTRUCTIONS ===",
+    "",
+    # CRITICAL: Instructions about user identity
+    "=== CRITICAL INSTRUCTIONS ===",
+    "You have access to detailed information about the USER in the 'USER IDENTITY' section below.",
+    "When the user asks 'Who am I?', 'tell me about myself', or similar, use that information to describe the USER.",
+    "The identity information contains the user's background, preferences, values, and work style.",
+    "=== END CRITICAL INSTRUCTIONS ===",
+    "",
+)
+
 
 class ContextBuilder:
     """Build system prompts from context"""
@@ -19,13 +63,18 @@ class ContextBuilder:
         """
         self.max_tokens = config.get('max_tokens', 4000)
         self.search_results = config.get('search_results', 5)
+        
+        # Static parts of the system prompt, joined once (only the timestamp
+        # between them changes per message)
+        self._preamble_head = "".join(line + "\n" for line in _PREAMBLE_HEAD_LINES)
+        self._preamble_body = "".join(line + "\n" for line in _PREAMBLE_BODY_LINES)
     
-    def build_system_prompt(self, context: Dict[str, Any]) -> str:
+    def build_system_prompt(self, context: Mapping[str, Any]) -> str:
         """
         Build system prompt from context
         
         Args:
-            context: Context dict from plugins with:
+            context: Context mapping from plugins with:
                 - query: The user query
                 - core_identity: User preferences/identity
                 - recent_messages: Last N messages
@@ -36,77 +85,51 @@ class ContextBuilder:
             System prompt string
         """
         
-        prompt_parts = []
-
-        # Base system message
-        prompt_parts.append("You are Orion, a personal cognitive augmentation assistant.")
-        prompt_parts.append("You are helpful, honest, and direct.")
-        prompt_parts.append("Current time: " + datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-        prompt_parts.append("")
-
-        # Markdown formatting instructions for Telegram
-        prompt_parts.append("=== FORMATTING INSTRUCTIONS ===")
-        prompt_parts.append("You are communicating via Telegram. Use Telegram's markdown format:")
-        prompt_parts.append("- Use *single asterisks* for **bold** text")
-        prompt_parts.append("- Use _single underscores_ for _italic_ text")
-        prompt_parts.append("- Use `backticks` for `inline code`")
-        prompt_parts.append("- Use ```code blocks``` for code (no language tag needed)")
-        prompt_parts.append("- Use • (bullet) for lists, not - dashes")
-        prompt_parts.append("- Do NOT use ## or ### for headers (just use *bold* for emphasis)")
-        prompt_parts.append("- Do NOT use **double asterisks** or __double underscores__")
-        prompt_parts.append("=== END FORMATTING INSTRUCTIONS ===")
-        prompt_parts.append("")
-
-        # CRITICAL: Instructions about user identity
-        prompt_parts.append("=== CRITICAL INSTRUCTIONS ===")
-        prompt_parts.append("You have access to detailed information about the USER in the 'USER IDENTITY' section below.")
-        prompt_parts.append("When the user asks 'Who am I?', 'tell me about myself', or similar, use that information to describe the USER.")
-        prompt_parts.append("The identity information contains the user's background, preferences, values, and work style.")
-        prompt_parts.append("=== END CRITICAL INSTRUCTIONS ===")
-        prompt_parts.append("")
+        # Resolve and slice every section once up front
+        core_identity = context.get('core_identity')
+        recent = (context.get('recent_messages') or ())[-5:]  # Last 5 messages
+        vault = (context.get('vault_results') or ())[:3]  # Top 3 results
+        vector = (context.get('vector_results') or ())[:3]  # Top 3 results
+        
+        buf = StringIO()
+        w = buf.write
         
-        # CRITICAL: Instructions about user identity
-        prompt_parts.append("=== CRITICAL INSTRUCTIONS ===")
-        prompt_parts.append("You have access to detailed information about the USER in the 'USER IDENTITY' section below.")
-        prompt_parts.append("When user asks 'Who am I?', 'tell me about myself', or similar, use that information to describe the USER.")
-        prompt_parts.append("The identity information contains the user's background, preferences, values, and work style.")
-        prompt_parts.append("=== END CRITICAL INSTRUCTIONS ===")
-        prompt_parts.append("")
+        w(self._preamble_head)
+        w("Current time: " + _current_timestamp() + "\n\n")
+        w(self._preamble_body)
         
         # Add core identity if available
-        if 'core_identity' in context and context['core_identity']:
-            prompt_parts.append("## USER IDENTITY & PREFERENCES")
-            prompt_parts.append("The following information is about the USER (the person you are assisting), NOT about you (Orion).")
-            prompt_parts.append("")
-            prompt_parts.append(context['core_identity'])
-            prompt_parts.append("")
-            prompt_parts.append("IMPORTANT: When user asks 'Who am I?', 'Who am I', or similar questions, use the information above to describe the USER.")
-            prompt_parts.append("")
-            prompt_parts.append("IMPORTANT: Use this information to understand who the user is, their preferences, work style, and how they prefer to interact.")
-            prompt_parts.append("")
+        if core_identity:
+            w("## USER IDENTITY & PREFERENCES\n"
+              "The following information is about the USER (the person you are assisting), NOT about you (Orion).\n\n")
+            w(core_identity)
+            w("\n\n"
+              "IMPORTANT: When user asks 'Who am I?', 'Who am I', or similar questions, use the information above to describe the USER.\n\n"
+              "IMPORTANT: Use this information to understand who the user is, their preferences, work style, and how they prefer to interact.\n\n")
         
         # Add recent conversation if available
-        if 'recent_messages' in context and context['recent_messages']:
-            prompt_parts.append("## RECENT CONVERSATION")
-            for msg in context['recent_messages'][-5:]:  # Last 5 messages
-                role = msg.get('role', 'user').upper()
-                content = msg.get('content', '')
-                prompt_parts.append(f"{role}: {content}")
-            prompt_parts.append("")
+        if recent:
+            w("## RECENT CONVERSATION\n")
+            for msg in recent:
+                get = msg.get
+                w(f"{get('role', 'user').upper()}: {get('content', '')}\n")
+            w("\n")
         
         # Add vault results if available
-        if 'vault_results' in context and context['vault_results']:
-            prompt_parts.append("## ACTIVE PROJECTS & NOTES")
-            for result in context['vault_results'][:3]:  # Top 3 results
-                prompt_parts.append(f"### {result.get('file', 'Unknown')}")
-                prompt_parts.append(result.get('content', '')[:500])  # First 500 chars
-                prompt_parts.append("")
+        if vault:
+            w("## ACTIVE PROJECTS & NOTES\n")
+            for result in vault:
+                get = result.get
+                w(f"### {get('file', 'Unknown')}\n")
+                w(get('content', '')[:500])  # First 500 chars
+                w("\n\n")
         
         # Add vector search results if available
-        if 'vector_results' in context and context['vector_results']:
-            prompt_parts.append("## RELEVANT PAST CONTEXT")
-            for result in context['vector_results'][:3]:  # Top 3 results
-                prompt_parts.append(f"- {result.get('text', '')[:200]}")
-            prompt_parts.append("")
+        if vector:
+            w("## RELEVANT PAST CONTEXT\n")
+            for result in vector:
+                w(f"- {result.get('text', '')[:200]}\n")
+            w("\n")
         
-        return "\n".join(prompt_parts)
+        # Every line above is newline-terminated; drop the final terminator
+        return buf.getvalue()[:-1]
@@ -1,8 +1,9 @@
 """Main message processing pipeline with enhancements"""
 
+import asyncio
 import logging
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from src.core.plugin_manager import PluginManager
 from src.core.context_builder import ContextBuilder
@@ -22,11 +23,17 @@ class MessageProcessor:
     - Context retrieval from multiple sources
     - Response generation with Ollama
     - Response enhancement (uncertainty, sources, error handling)
+    
+    Storage is write-behind: both messages of a turn are queued after the
+    response is generated and a background task hands them to the storage
+    plugins in batches, off the reply path.
     """
     
     def __init__(self, plugin_manager: PluginManager, 
                  context_builder: ContextBuilder,
-                 llm_client):
+                 llm_client,
+                 store_flush_interval: float = 0.1,
+                 store_max_batch: int = 16):
         """
         Initialize message processor
         
@@ -34,15 +41,23 @@ class MessageProcessor:
             plugin_manager: Plugin manager for storage/retrieval
             context_builder: Context builder for prompts
             llm_client: LLM client (Ollama)
+            store_flush_interval: Max seconds to wait to fill a storage batch
+            store_max_batch: Max messages per storage batch
         """
         self.plugins = plugin_manager
         self.context_builder = context_builder
         self.llm = llm_client
         
+        # Write-behind storage queue; created lazily on the running loop
+        self.store_flush_interval = store_flush_interval
+        self.store_max_batch = store_max_batch
+        self._store_queue: Optional[asyncio.Queue] = None
+        self._store_task: Optional[asyncio.Task] = None
+        
         # Enhancement tools
-        self.enhancer = ResponseEnhancer()
-        self.conflict_detector = ConflictDetector()
-        self.error_acknowledger = ErrorAcknowledger()
+        self.enhancer = ResponseEnhancer.shared()
+        self.conflict_detector = ConflictDetector.shared()
+        self.error_acknowledger = ErrorAcknowledger.shared()
     
     async def process_message(self, message: str, user_id: str = None) -> str:
         """
@@ -55,7 +70,7 @@ class MessageProcessor:
         Returns:
             Enhanced response with sources and uncertainty markers
         """
-        logger.info(f"Processing message: {message[:50]}...")
+        logger.info("Processing message: %.50s...", message)
         
         # Check if this is a correction
         correction_prefix = ""
@@ -70,11 +85,9 @@ class MessageProcessor:
             'message_type': 'user'
         }
         
-        # Run processing plugins (store message, extract info)
-        await self.plugins.process_message(message, metadata)
-        
-        # Build context from retrieval plugins
-        base_context = {'query': message}
+        # Build context from retrieval plugins (user_id scopes vector search
+        # to this user's messages)
+        base_context = {'query': message, 'user_id': user_id}
         context = await self.plugins.build_context(message, base_context)
         
         # Build system prompt
@@ -87,7 +100,8 @@ class MessageProcessor:
                 user_message=message
             )
         except Exception as e:
-            logger.error(f"LLM generation failed: {e}")
+            logger.error("LLM generation failed: %s", e)
+            self._enqueue_store(message, metadata)
             return "I encountered an error processing your message. Please try again."
         
         # Enhance response with uncertainty + sources
@@ -107,8 +121,70 @@ class MessageProcessor:
             'user_id': user_id,
             'message_type': 'assistant'
         }
-        await self.plugins.process_message(enhanced_response, response_metadata)
         
-        logger.info(f"Generated enhanced response: {enhanced_response[:50]}...")
+        # Store both messages of the turn (write-behind, one batch)
+        self._enqueue_store(message, metadata)
+        self._enqueue_store(enhanced_response, response_metadata)
+        
+        logger.info("Generated enhanced response: %.50s...", enhanced_response)
         
         return enhanced_response
+    
+    def _enqueue_store(self, message: str, metadata: Dict[str, Any]):
+        """Queue a message for the storage plugins, starting the writer if needed"""
+        if self._store_task is None or self._store_task.done():
+            self._store_queue = asyncio.Queue()
+            self._store_task = asyncio.get_running_loop().create_task(self._store_worker())
+        
+        self._store_queue.put_nowait((message, metadata))
+    
+    async def _store_worker(self):
+        """Drain the storage queue in batches of up to store_max_batch"""
+        queue = self._store_queue
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.store_flush_interval
+            
+            # Collect more items until the batch is full or the window closes
+            while len(batch) < self.store_max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                await self.plugins.process_batch(batch)
+            except Exception as e:
+                logger.error("Failed to store message batch: %s", e)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+    
+    async def flush(self):
+        """Wait until all queued messages have been stored, then stop the writer"""
+        if self._store_task is None:
+            return
+        
+        if not self._store_task.done():
+            await self._store_queue.join()
+            self._store_task.cancel()
+            try:
+                await self._store_task
+            except asyncio.CancelledError:
+                pass
+        
+        self._store_task = None
+        self._store_queue = None
+    
+    async def shutdown(self):
+        """Flush pending storage and release the LLM client's connections"""
+        await self.flush()
+        
+        close = getattr(self.llm, 'close', None)
+        if close is not None:
+            await close()
@@ -1,11 +1,21 @@
 """Plugin manager for Orion"""
 
+import asyncio
 import logging
-from typing import Dict, Any, List
+from collections import ChainMap
+from typing import Dict, Any, List, Mapping, Optional, Tuple
 from src.plugins.base_plugin import BasePlugin
 
 logger = logging.getLogger(__name__)
 
+# How retrieved values merge into an existing context value of the same
+# exact type: (in-place merge for overlay-owned values, copying merge for
+# values still owned by base_context). Other types keep the first value.
+_MERGERS = {
+    list: (list.extend, list.__add__),
+    dict: (dict.update, lambda existing, value: {**existing, **value}),
+}
+
 
 class PluginManager:
     """Manage plugin lifecycle and execution"""
@@ -13,6 +23,14 @@ class PluginManager:
     def __init__(self):
         self.plugins: Dict[str, BasePlugin] = {}
         self.config_map: Dict[str, Dict[str, Any]] = {}
+        # Enabled plugins in registration order; rebuilt lazily after
+        # register/set_enabled/shutdown_all
+        self._enabled_cache: Optional[Tuple[BasePlugin, ...]] = None
+    
+    def _refresh_enabled(self) -> Tuple[BasePlugin, ...]:
+        """Rebuild and return the tuple of enabled plugins"""
+        self._enabled_cache = tuple(p for p in self.plugins.values() if p.enabled)
+        return self._enabled_cache
     
     async def register(self, plugin: BasePlugin, config: Dict[str, Any]):
         """
@@ -25,13 +43,28 @@ class PluginManager:
         plugin_name = plugin.name
         
         if plugin_name in self.plugins:
-            logger.warning(f"Plugin {plugin_name} already registered, replacing")
+            logger.warning("Plugin %s already registered, replacing", plugin_name)
         
         self.plugins[plugin_name] = plugin
         self.config_map[plugin_name] = config
+        self._enabled_cache = None
         
         await plugin.initialize(config)
-        logger.info(f"Registered plugin: {plugin_name}")
+        logger.info("Registered plugin: %s", plugin_name)
+    
+    def set_enabled(self, plugin_name: str, enabled: bool):
+        """
+        Enable or disable a registered plugin at runtime
+        
+        Toggle plugins here rather than through plugin.enabled directly,
+        so the cached enabled-plugin list is rebuilt.
+        
+        Args:
+            plugin_name: Registered plugin name
+            enabled: New enabled state
+        """
+        self.plugins[plugin_name].enabled = enabled
+        self._enabled_cache = None
     
     async def process_message(self, message: str, metadata: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
@@ -46,58 +79,113 @@ class PluginManager:
         """
         results = []
         
-        for plugin in self.plugins.values():
-            if not plugin.enabled:
+        # Storage plugins are independent, so run them concurrently
+        plugins = self._enabled_cache
+        if plugins is None:
+            plugins = self._refresh_enabled()
+        outcomes = await asyncio.gather(
+            *(plugin.process(message, metadata) for plugin in plugins),
+            return_exceptions=True
+        )
+        
+        for plugin, result in zip(plugins, outcomes):
+            if isinstance(result, BaseException):
+                logger.error("Error processing message in %s: %s", plugin.name, result)
+            elif result:
+                results.append(result)
+        
+        return results
+    
+    async def process_batch(self, items: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Run a batch of messages through all storage plugins
+        
+        Args:
+            items: List of (message, metadata) tuples, in arrival order
+        
+        Returns:
+            List of processing results from plugins
+        """
+        results = []
+        
+        plugins = self._enabled_cache
+        if plugins is None:
+            plugins = self._refresh_enabled()
+        outcomes = await asyncio.gather(
+            *(plugin.process_batch(items) for plugin in plugins),
+            return_exceptions=True
+        )
+        
+        for plugin, batch_results in zip(plugins, outcomes):
+            if isinstance(batch_results, BaseException):
+                logger.error("Error processing batch in %s: %s", plugin.name, batch_results)
                 continue
-            
-            try:
-                result = await plugin.process(message, metadata)
-                if result:
-                    results.append(result)
-            except Exception as e:
-                logger.error(f"Error processing message in {plugin.name}: {e}")
+            results.extend(result for result in batch_results if result)
         
         return results
     
-    async def build_context(self, query: str, base_context: Dict[str, Any]) -> Dict[str, Any]:
+    async def build_context(self, query: str, base_context: Dict[str, Any]) -> Mapping[str, Any]:
         """
         Run retrieval plugins to build context
         
         Args:
             query: User query
-            base_context: Base context to augment
+            base_context: Base context to augment (never modified)
         
         Returns:
-            Augmented context dict
+            Augmented context mapping: retrieved keys layered over base_context
         """
-        context = base_context.copy()
+        # Writes go to the overlay; reads fall back to base_context
+        overlay: Dict[str, Any] = {}
+        context = ChainMap(overlay, base_context)
+        
+        # Retrievals are independent, so run them concurrently against the
+        # base context and merge afterwards in registration order
+        plugins = self._enabled_cache
+        if plugins is None:
+            plugins = self._refresh_enabled()
+        outcomes = await asyncio.gather(
+            *(plugin.retrieve(query, context) for plugin in plugins),
+            return_exceptions=True
+        )
         
-        for plugin in self.plugins.values():
-            if not plugin.enabled:
+        for plugin, retrieved in zip(plugins, outcomes):
+            if isinstance(retrieved, BaseException):
+                logger.error("Error retrieving context from %s: %s", plugin.name, retrieved)
                 continue
-            
-            try:
-                retrieved = await plugin.retrieve(query, context)
-                if retrieved:
-                    # Merge retrieved data into context
-                    for key, value in retrieved.items():
-                        if key not in context:
-                            context[key] = value
-                        elif isinstance(context[key], list) and isinstance(value, list):
-                            context[key].extend(value)
-                        elif isinstance(context[key], dict) and isinstance(value, dict):
-                            context[key].update(value)
-            except Exception as e:
-                logger.error(f"Error retrieving context from {plugin.name}: {e}")
+            if retrieved:
+                # Merge retrieved data into context
+                for key, value in retrieved.items():
+                    if key not in context:
+                        overlay[key] = value
+                        continue
+                    
+                    existing = context[key]
+                    kind = type(existing)
+                    merger = _MERGERS.get(kind)
+                    if merger is None or type(value) is not kind:
+                        continue
+                    
+                    # Values still owned by base_context are copied on write
+                    merge_in_place, merge_copy = merger
+                    if key in overlay:
+                        merge_in_place(existing, value)
+                    else:
+                        overlay[key] = merge_copy(existing, value)
         
         return context
     
     async def shutdown_all(self):
-        """Shutdown all plugins"""
-        for plugin in self.plugins.values():
-            try:
-                await plugin.shutdown()
-            except Exception as e:
-                logger.error(f"Error shutting down {plugin.name}: {e}")
+        """Shutdown all plugins (concurrently)"""
+        plugins = list(self.plugins.values())
+        outcomes = await asyncio.gather(
+            *(plugin.shutdown() for plugin in plugins),
+            return_exceptions=True
+        )
+        
+        for plugin, outcome in zip(plugins, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error("Error shutting down %s: %s", plugin.name, outcome)
         
+        self._enabled_cache = None
         logger.info("All plugins shut down")
@@ -1,26 +1,111 @@
 """Response enhancement with uncertainty markers, source citations, and error handling"""
 
 import logging
-from typing import List, Optional
+import re
+import sys
+from enum import IntEnum
+from typing import Iterable, List, Optional, Type, TypeVar
 from dataclasses import dataclass
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+def _build_phrase_automaton(phrases: Iterable[str]):
+    """
+    Build an Aho-Corasick automaton matching any of the phrases
+    
+    Returns None when pyahocorasick is not installed; callers fall back
+    to per-phrase substring checks.
+    """
+    if not AHOCORASICK_AVAILABLE:
+        return None
+    
+    automaton = ahocorasick.Automaton()
+    for phrase in phrases:
+        automaton.add_word(phrase, phrase)
+    automaton.make_automaton()
+    return automaton
+
+
+def _contains_any(automaton, phrases: Iterable[str], text: str) -> bool:
+    """True if text contains any phrase (one automaton pass when available)"""
+    if automaton is not None:
+        return next(automaton.iter(text), None) is not None
+    return any(phrase in text for phrase in phrases)
+
+
+_UNCERTAINTY_MARKERS = (
+    'i think', 'probably', 'maybe', 'not sure',
+    'might be', 'could be', 'seems like',
+    'if i recall', 'i believe'
+)
+_UNCERTAINTY_AUTOMATON = _build_phrase_automaton(_UNCERTAINTY_MARKERS)
+
+# Words ignored when comparing topics
+_STOPWORDS = frozenset({'i', 'the', 'a', 'an', 'is', 'am', 'are', 'was', 'were'})
+
+# Preference indicators
+_PREF_WORDS = ('prefer', 'like', 'better', 'favorite', 'choose')
+
+
+class SourceType(IntEnum):
+    """Kind of source; integer-valued so type checks are int compares"""
+    CORE = 0
+    CONVERSATION = 1
+    VAULT = 2
+
+
+# Fixed fragments of the sources footer
+_HDR_SOURCES = "\n\n📚 Sources:"
+_CORE_LINE = "\n• Your preferences"
+_VAULT_PREFIX = "\n• vault/"
+_EARLIER_LINE = "\n• Earlier in this conversation"
+
+# dataclass(slots=True) needs Python 3.10; older interpreters keep __dict__
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+_T = TypeVar('_T', bound='_SharedInstance')
+
+
+class _SharedInstance:
+    """Mixin for stateless helpers: one lazily created instance per class"""
+    
+    __slots__ = ()
+    
+    @classmethod
+    def shared(cls: Type[_T]) -> _T:
+        """Process-wide instance; these helpers hold no per-user state"""
+        # Looked up in the class's own __dict__ so subclasses get their own
+        instance = cls.__dict__.get('_shared')
+        if instance is None:
+            instance = cls()
+            cls._shared = instance
+        return instance
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class Source:
     """Source of information used in response"""
-    type: str  # 'core', 'conversation', 'vault'
+    type: SourceType
     name: str = ""
     file: str = ""
     days_ago: int = 0
 
 
-class ResponseEnhancer:
+class ResponseEnhancer(_SharedInstance):
     """
     Enhance responses with uncertainty markers and source citations
     """
     
+    __slots__ = ()
+    
     def enhance_response(self, response: str, sources: List[Source], 
                         query: str = "") -> str:
         """
@@ -42,11 +127,12 @@ class ResponseEnhancer:
         # Add uncertainty marker if needed
         uncertainty = self._get_uncertainty_marker(sources)
         if uncertainty and not self._already_has_uncertainty(response):
-            # Add at end of first sentence
-            sentences = response.split('. ')
-            if len(sentences) > 0:
-                sentences[0] += f" {uncertainty}"
-                enhanced = '. '.join(sentences)
+            # Add at end of first sentence (or of the whole response)
+            end = response.find('. ')
+            if end == -1:
+                enhanced = f"{response} {uncertainty}"
+            else:
+                enhanced = f"{response[:end]} {uncertainty}{response[end:]}"
         
         # Add source citations
         enhanced += self._format_sources(sources)
@@ -61,30 +147,39 @@ class ResponseEnhancer:
         if not sources:
             return "(not certain - please confirm)"
         
-        # Core identity = high confidence
-        if any(s.type == 'core' for s in sources):
+        # One pass: track conversation ages, stop early on core identity
+        min_days = None
+        max_days = None
+        for src in sources:
+            kind = src.type
+            if kind == SourceType.CORE:
+                # Core identity = high confidence
+                return ""
+            if kind == SourceType.CONVERSATION:
+                days = src.days_ago
+                if min_days is None:
+                    min_days = max_days = days
+                elif days < min_days:
+                    min_days = days
+                elif days > max_days:
+                    max_days = days
+        
+        if min_days is None:
             return ""
         
         # Only old conversations = uncertainty
-        conversation_sources = [s for s in sources if s.type == 'conversation']
-        if conversation_sources and all(s.days_ago > 30 for s in conversation_sources):
+        if min_days > 30:
             return "(from a while ago - still current?)"
         
         # Mixed recent sources = moderate confidence
-        if any(s.days_ago > 7 for s in conversation_sources):
+        if max_days > 7:
             return "(based on what we discussed)"
         
         return ""
     
     def _already_has_uncertainty(self, response: str) -> bool:
         """Check if response already expresses uncertainty"""
-        uncertainty_markers = [
-            'i think', 'probably', 'maybe', 'not sure', 
-            'might be', 'could be', 'seems like',
-            'if i recall', 'i believe'
-        ]
-        response_lower = response.lower()
-        return any(marker in response_lower for marker in uncertainty_markers)
+        return _contains_any(_UNCERTAINTY_AUTOMATON, _UNCERTAINTY_MARKERS, response.lower())
     
     def _format_sources(self, sources: List[Source]) -> str:
         """
@@ -93,37 +188,48 @@ class ResponseEnhancer:
         if not sources:
             return ""
         
-        output = "\n\n📚 Sources:"
+        parts = [_HDR_SOURCES]
         
-        # Group by type
-        core_sources = [s for s in sources if s.type == 'core']
-        vault_sources = [s for s in sources if s.type == 'vault']
-        convo_sources = [s for s in sources if s.type == 'conversation']
+        # Group by type in one pass
+        has_core = False
+        vault_files = []
+        most_recent = None
+        for src in sources:
+            kind = src.type
+            if kind == SourceType.CORE:
+                has_core = True
+            elif kind == SourceType.VAULT:
+                if len(vault_files) < 2:  # only the first two are listed
+                    vault_files.append(src.file)
+            elif kind == SourceType.CONVERSATION:
+                if most_recent is None or src.days_ago < most_recent:
+                    most_recent = src.days_ago
         
         # Add core
-        if core_sources:
-            output += "\n• Your preferences"
+        if has_core:
+            parts.append(_CORE_LINE)
         
         # Add vault (max 2)
-        for src in vault_sources[:2]:
-            output += f"\n• vault/{src.file}"
+        for file in vault_files:
+            parts.append(_VAULT_PREFIX + file)
         
         # Add conversations
-        if convo_sources:
-            most_recent = min(s.days_ago for s in convo_sources)
+        if most_recent is not None:
             if most_recent == 0:
-                output += "\n• Earlier in this conversation"
+                parts.append(_EARLIER_LINE)
             else:
-                output += f"\n• Conversation ({most_recent} days ago)"
+                parts.append(f"\n• Conversation ({most_recent} days ago)")
         
-        return output
+        return "".join(parts)
 
 
-class ConflictDetector:
+class ConflictDetector(_SharedInstance):
     """
     Detect when new information conflicts with old
     """
     
+    __slots__ = ()
+    
     def detect_conflict(self, new_info: str, existing_info: List[str]) -> Optional[str]:
         """
         Check if new information conflicts with existing
@@ -132,61 +238,74 @@ class ConflictDetector:
             Conflict message if detected, None otherwise
         """
         
+        # Fold and tokenize the new information once for all comparisons
+        new_lower = new_info.lower()
+        new_words = self._topic_words(new_lower)
+        
         for old_info in existing_info:
-            if self._same_topic(new_info, old_info):
-                if self._contradicts(new_info, old_info):
+            old_lower = old_info.lower()
+            if self._same_topic(new_words, old_lower):
+                if self._contradicts(new_lower, old_lower):
                     return f"(you mentioned '{old_info}' before - using latest)"
         
         return None
     
-    def _same_topic(self, info1: str, info2: str) -> bool:
+    @staticmethod
+    def _topic_words(info_lower: str) -> frozenset:
+        """Words of already-lowercased text, minus common words"""
+        return frozenset(info_lower.split()) - _STOPWORDS
+    
+    def _same_topic(self, words1: frozenset, info2_lower: str) -> bool:
         """
         Check if two pieces of information are about the same thing
         Simple keyword overlap for MVP
-        """
-        words1 = set(info1.lower().split())
-        words2 = set(info2.lower().split())
         
-        # Remove common words
-        common = {'i', 'the', 'a', 'an', 'is', 'am', 'are', 'was', 'were'}
-        words1 -= common
-        words2 -= common
+        Args:
+            words1: Topic words of the first text (see _topic_words)
+            info2_lower: Second text, already lowercased
+        """
+        words2 = self._topic_words(info2_lower)
         
         # Significant overlap = same topic
         overlap = words1 & words2
         return len(overlap) >= 2
     
-    def _contradicts(self, info1: str, info2: str) -> bool:
+    def _contradicts(self, info1_lower: str, info2_lower: str) -> bool:
         """
-        Simple contradiction detection
+        Simple contradiction detection (inputs already lowercased)
         """
-        # Preference indicators
-        pref_words = ['prefer', 'like', 'better', 'favorite', 'choose']
-        
-        has_pref1 = any(w in info1.lower() for w in pref_words)
-        has_pref2 = any(w in info2.lower() for w in pref_words)
+        has_pref1 = any(w in info1_lower for w in _PREF_WORDS)
+        has_pref2 = any(w in info2_lower for w in _PREF_WORDS)
         
         # Both express preferences = potential conflict
         if has_pref1 and has_pref2:
             return True
         
         # Negation patterns
-        if ('not' in info1.lower() or 'no' in info1.lower()) != \
-           ('not' in info2.lower() or 'no' in info2.lower()):
+        if ('not' in info1_lower or 'no' in info1_lower) != \
+           ('not' in info2_lower or 'no' in info2_lower):
             return True
         
         return False
 
 
-class ErrorAcknowledger:
+class ErrorAcknowledger(_SharedInstance):
     """
     Detect and acknowledge user corrections
     """
     
-    correction_phrases = [
+    __slots__ = ()
+    
+    # Tuple so str.startswith can test every prefix in one C-level call
+    correction_phrases = (
         'no', 'nope', 'wrong', 'incorrect', 'actually', 
         'not quite', "that's not right", "that's wrong"
-    ]
+    )
+    
+    # Any correction phrase as a whole word/phrase, in one regex scan
+    _CORRECTION_CONTAINS_RE = re.compile(
+        r"\b(?:" + "|".join(map(re.escape, correction_phrases)) + r")\b"
+    )
     
     def is_correction(self, message: str) -> bool:
         """
@@ -195,14 +314,13 @@ class ErrorAcknowledger:
         message_lower = message.lower().strip()
         
         # Check if message starts with correction phrase
-        for phrase in self.correction_phrases:
-            if message_lower.startswith(phrase):
-                return True
+        if message_lower.startswith(self.correction_phrases):
+            return True
         
         # Check if correction phrase is prominent
         words = message_lower.split()
         if len(words) <= 5:  # Short message
-            return any(phrase in message_lower for phrase in self.correction_phrases)
+            return self._CORRECTION_CONTAINS_RE.search(message_lower) is not None
         
         return False
     
@@ -1,11 +1,75 @@
 """Convert bot responses to Telegram markdown formatting"""
 
+import functools
 import logging
 import re
-from typing import Dict, Any
+from typing import Dict, Any, Iterator
+
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Uncertainty markers added by ResponseEnhancer, mapped to their italic form
+_UNCERT_ITALIC = {
+    marker: f"_{marker}_"
+    for marker in (
+        'not certain - please confirm',
+        'from a while ago - still current?',
+        'based on what we discussed',
+    )
+}
+_UNCERT_ALT = '|'.join(map(re.escape, _UNCERT_ITALIC))
+
+# Patterns used on every formatted reply, compiled once at import
+# (with their replacement templates)
+_BOLD_RE = re.compile(r'\*\*(.+?)\*\*')
+_BOLD_REPL = r'*\1*'
+_UNCERT_RE = re.compile(r'\((' + _UNCERT_ALT + r')\)')
+_UNCERT_REPL = r'_\1_'
+# All _format_main_response conversions in one alternation; exactly one
+# group participates per match: 1 = **bold**, 2 = ## header, 3 = - bullet,
+# 4 = uncertainty marker
+_MAIN_PATTERN = (
+    r'(?m)\*\*(.+?)\*\*'
+    r'|^## (.+)$'
+    r'|^(- )'
+    r'|\((' + _UNCERT_ALT + r')\)'
+)
+
+
+def _compile_main_pattern():
+    """
+    Compile _MAIN_PATTERN with RE2 (linear-time DFA) when available,
+    falling back to the standard re engine
+    """
+    if RE2_AVAILABLE:
+        try:
+            return re2.compile(_MAIN_PATTERN)
+        except Exception as e:
+            logger.warning(f"re2 could not compile formatter pattern, using re: {e}")
+    return re.compile(_MAIN_PATTERN)
+
+
+_MAIN_RE = _compile_main_pattern()
+_VAULT_RE = re.compile(r'vault/([^ ]+)')
+_VAULT_REPL = r'`vault/\1`'
+_FORMAT_CHARS = '*_`~'
+# Unmatched formatting at the end or start of the text, in one pass
+_EDGE_FMT_RE = re.compile(r'^\s*[\*_`~]+|[\*_`~]+\s*$')
+_TRIPLE_NL_RE = re.compile(r'\n\n\n+')
+# MarkdownV2 special characters -> backslash escapes, applied in one pass
+_TG_ESCAPE_TABLE = str.maketrans({c: '\\' + c for c in '\\_*[]()~`>#+-=|{}.!'})
+
+
+@functools.lru_cache(maxsize=256)
+def _format_key(key: str) -> str:
+    """Display form of a dict key: 'max_tokens' -> 'Max Tokens'"""
+    return key.replace('_', ' ').title()
+
 
 class TelegramFormatter:
     """
@@ -39,11 +103,11 @@ class TelegramFormatter:
             Telegram-formatted response
         """
 
-        # Split response and sources if present
-        if include_sources and "📚 Sources:" in response:
-            parts = response.split("📚 Sources:")
-            main_response = parts[0].strip()
-            sources = "📚 Sources:" + parts[1]
+        # Split response and sources if present (one scan for the marker)
+        main_response, marker, rest = response.partition("📚 Sources:")
+        if include_sources and marker:
+            main_response = main_response.rstrip()
+            sources = marker + rest
 
             # Format main response and sources separately
             formatted_main = TelegramFormatter._format_main_response(main_response)
@@ -66,34 +130,41 @@ class TelegramFormatter:
         """
 
         text = text.strip()
+        
+        # Plain replies (no token any conversion starts with) need no regex
+        if '**' not in text and '## ' not in text and '- ' not in text and '(' not in text:
+            return text
+        
+        return _MAIN_RE.sub(TelegramFormatter._replace_main, text)
 
-        # Convert **bold** to *bold* (common markdown)
-        text = re.sub(r'\*\*(.+?)\*\*', r'*\1*', text)
-
-        # Convert ## Headers to *bold* (Telegram has no headers)
-        text = re.sub(r'^## (.+)$', r'*\1*', text, flags=re.MULTILINE)
-
-        # Convert - bullets to • (Telegram prefers emoji bullets)
-        text = re.sub(r'^- ', r'• ', text, flags=re.MULTILINE)
-
-        # Format uncertainty markers with italics
-        text = re.sub(
-            r'\(not certain - please confirm\)',
-            r'_not certain - please confirm_',
-            text
-        )
-        text = re.sub(
-            r'\(from a while ago - still current\?\)',
-            r'_from a while ago - still current?_',
-            text
-        )
-        text = re.sub(
-            r'\(based on what we discussed\)',
-            r'_based on what we discussed_',
-            text
-        )
-
-        return text
+    @staticmethod
+    def _replace_main(match) -> str:
+        """
+        Replacement for one _MAIN_RE match; output matches applying the
+        bold, header, bullet and uncertainty conversions one after another
+        """
+        # groups() rather than lastindex: works for both re and re2 matches
+        bold, header, bullet, marker = match.groups()
+        # (nested conversions are rare; plain substring tests skip the
+        # regex engine unless their opening token is present)
+        if bold is not None:
+            # Convert **bold** to *bold* (common markdown); markers inside
+            # still get italicized
+            if '(' in bold:
+                bold = _UNCERT_RE.sub(_UNCERT_REPL, bold)
+            return '*' + bold + '*'
+        if header is not None:
+            # Convert ## Headers to *bold* (Telegram has no headers)
+            if '**' in header:
+                header = _BOLD_RE.sub(_BOLD_REPL, header)
+            if '(' in header:
+                header = _UNCERT_RE.sub(_UNCERT_REPL, header)
+            return '*' + header + '*'
+        if bullet is not None:
+            # Convert - bullets to • (Telegram prefers emoji bullets)
+            return '• '
+        # Format uncertainty markers with italics: "(marker)" -> "_marker_"
+        return _UNCERT_ITALIC[marker]
     
     @staticmethod
     def _format_sources(sources_text: str) -> str:
@@ -103,22 +174,24 @@ class TelegramFormatter:
         formatted_lines = []
 
         for line in lines:
-            if line.strip().startswith('📚'):
+            stripped = line.strip()
+            if not stripped:
+                continue
+            
+            # Dispatch on the first character (each marker is one code point)
+            first = stripped[0]
+            if first == '📚':
                 # Keep emoji header as-is (no markdown needed)
-                formatted_lines.append(line.strip())
-            elif line.strip().startswith('•'):
+                formatted_lines.append(stripped)
+            elif first == '•':
                 # Keep bullet format but make file paths code
-                source = line.strip()
-                source = re.sub(
-                    r'vault/([^ ]+)',
-                    r'`vault/\1`',
-                    source
-                )
-                formatted_lines.append(source)
-            elif line.strip().startswith('('):
+                if 'vault/' in stripped:
+                    stripped = _VAULT_RE.sub(_VAULT_REPL, stripped)
+                formatted_lines.append(stripped)
+            elif first == '(':
                 # Format metadata in italics
-                formatted_lines.append(f"_{line.strip()}_")
-            elif line.strip():
+                formatted_lines.append(f"_{stripped}_")
+            else:
                 formatted_lines.append(line)
 
         return '\n'.join(formatted_lines)
@@ -137,39 +210,31 @@ class TelegramFormatter:
     @staticmethod
     def format_list(items: list, title: str = "") -> str:
         """Format a list for Telegram"""
-        formatted = ""
-        if title:
-            formatted += f"*{title}*\n"
+        parts = [f"*{title}*\n"] if title else []
+        parts.extend(f"• {item}\n" for item in items)
         
-        for item in items:
-            formatted += f"• {item}\n"
-        
-        return formatted.strip()
+        return "".join(parts).strip()
     
     @staticmethod
     def format_key_value(data: Dict[str, Any], title: str = "") -> str:
         """Format key-value pairs for Telegram"""
-        formatted = ""
-        if title:
-            formatted += f"*{title}*\n"
+        parts = [f"*{title}*\n"] if title else []
         
         for key, value in data.items():
             # Format key in bold
-            key_formatted = key.replace('_', ' ').title()
-            formatted += f"*{key_formatted}:* {value}\n"
+            parts.append(f"*{_format_key(key)}:* {value}\n")
         
-        return formatted.strip()
+        return "".join(parts).strip()
     
     @staticmethod
     def escape_special_chars(text: str) -> str:
-        """Escape Telegram special characters if needed"""
-        # Most characters don't need escaping in Telegram markdown v2
-        # But these can cause issues:
-        special_chars = ['_', '*', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.', '!']
+        """
+        Escape Telegram MarkdownV2 special characters
         
-        # Only escape if we're not already in formatting
-        # This is a simple version - for production, use telegram's escape functions
-        return text
+        Only for plain text that must render literally: already formatted
+        text would have its own markup escaped too.
+        """
+        return text.translate(_TG_ESCAPE_TABLE)
     
     @staticmethod
     def format_code_block(code: str, language: str = "") -> str:
@@ -182,24 +247,24 @@ class TelegramFormatter:
     @staticmethod
     def format_context_info(context: Dict[str, Any]) -> str:
         """Format context information for debugging/display"""
-        formatted = "*Context Information:*\n"
+        parts = ["*Context Information:*\n"]
         
         if 'core_identity' in context:
-            formatted += f"\n*Identity:*\n{context['core_identity']}\n"
+            parts.append(f"\n*Identity:*\n{context['core_identity']}\n")
         
         if 'recent_messages' in context and context['recent_messages']:
-            formatted += f"\n*Recent Messages ({len(context['recent_messages'])} total):*\n"
+            parts.append(f"\n*Recent Messages ({len(context['recent_messages'])} total):*\n")
             for msg in context['recent_messages'][-3:]:  # Last 3
                 role = "You" if msg.get('role') == 'user' else "Assistant"
                 content = msg.get('content', '')[:100]
-                formatted += f"_{role}:_ {content}...\n"
+                parts.append(f"_{role}:_ {content}...\n")
         
         if 'vault_results' in context and context['vault_results']:
-            formatted += f"\n*Vault Files ({len(context['vault_results'])} total):*\n"
+            parts.append(f"\n*Vault Files ({len(context['vault_results'])} total):*\n")
             for result in context['vault_results'][:3]:  # Top 3
-                formatted += f"• `{result.get('file', 'unknown')}`\n"
+                parts.append(f"• `{result.get('file', 'unknown')}`\n")
         
-        return formatted
+        return "".join(parts)
     
     @staticmethod
     def truncate_message(text: str, max_length: int = 4096) -> list:
@@ -214,49 +279,60 @@ class TelegramFormatter:
         Returns:
             List of message chunks
         """
-        # First, validate and fix markdown entities
+        return list(TelegramFormatter.iter_chunks(text, max_length))
+    
+    @staticmethod
+    def iter_chunks(text: str, max_length: int = 4096) -> Iterator[str]:
+        """
+        Lazily split text into Telegram-sized message chunks
+        
+        Same chunks as truncate_message, but each is only sliced out when
+        requested, so a sender can await each chunk before the next.
+        
+        Args:
+            text: Text to potentially split
+            max_length: Max characters per message (Telegram limit is 4096)
+        
+        Yields:
+            Message chunks
+        """
+        # Validate and fix markdown entities. This only ever touches the two
+        # ends of the text, so it runs once on the whole text rather than
+        # per chunk (where it would strip balanced markup at chunk starts).
         text = TelegramFormatter._validate_markdown(text)
         
         if len(text) <= max_length:
-            return [text]
+            yield text
+            return
         
-        # Split by paragraphs first
-        paragraphs = text.split('\n\n')
-        messages = []
-        current_message = ""
+        # Walk the text by offsets: each chunk ends at the last paragraph
+        # break that fits, else the last sentence break, else a hard cut.
+        # Only the chunks themselves are sliced out.
+        length = len(text)
+        pos = 0
         
-        for para in paragraphs:
-            # If single paragraph is too long, split it
-            if len(para) > max_length:
-                # Save current message if it has content
-                if current_message:
-                    messages.append(current_message.strip())
-                    current_message = ""
-                
-                # Split long paragraph by sentences
-                sentences = para.split('. ')
-                for sentence in sentences:
-                    if len(current_message) + len(sentence) > max_length:
-                        messages.append(current_message.strip())
-                        current_message = sentence + ". "
-                    else:
-                        current_message += sentence + ". "
+        while pos < length:
+            end = pos + max_length
+            if end >= length:
+                cut = resume = length
             else:
-                # Try to add paragraph to current message
-                if len(current_message) + len(para) + 4 > max_length:  # +4 for \n\n
-                    if current_message:
-                        messages.append(current_message.strip())
-                    current_message = para
+                cut = text.rfind('\n\n', pos, end)
+                if cut > pos:
+                    resume = cut + 2
                 else:
-                    if current_message:
-                        current_message += "\n\n"
-                    current_message += para
-        
-        # Add final message
-        if current_message:
-            messages.append(current_message.strip())
-        
-        return messages
+                    cut = text.rfind('. ', pos, end)
+                    if cut > pos:
+                        # Keep the period with its sentence
+                        cut += 1
+                        resume = cut + 1
+                    else:
+                        cut = resume = end
+            
+            # Whitespace-only pieces strip to "", which Telegram refuses to send
+            chunk = text[pos:cut].strip()
+            if chunk:
+                yield chunk
+            pos = resume
     
     @staticmethod
     def _validate_markdown(text: str) -> str:
@@ -271,8 +347,10 @@ class TelegramFormatter:
         
         # Clean up unmatched formatting at start/end
         # But preserve properly matched *bold*, _italic_, and `code`
-        text = re.sub(r'[\*_`~]+\s*$', '', text)
-        text = re.sub(r'^\s*[\*_`~]+', '', text)
+        # (text is stripped, so the regex can only match when the first or
+        # last character is a formatting char; skip it otherwise)
+        if text and (text[0] in _FORMAT_CHARS or text[-1] in _FORMAT_CHARS):
+            text = _EDGE_FMT_RE.sub('', text)
         
         return text
 
@@ -280,54 +358,81 @@ class TelegramFormatter:
 class TelegramMessageBuilder:
     """Build complex Telegram messages"""
     
+    __slots__ = ('sections', '_last_was_blank', '_has_newlines')
+    
     def __init__(self):
         self.sections = []
+        # Consecutive blank sections are dropped as they are added, so build()
+        # only needs the blank-line regex when a section contains newlines
+        self._last_was_blank = False
+        self._has_newlines = False
+    
+    def clear(self) -> 'TelegramMessageBuilder':
+        """Drop all sections so the builder can be reused"""
+        self.sections.clear()
+        self._last_was_blank = False
+        self._has_newlines = False
+        return self
+    
+    def _append(self, section: str):
+        """Add a section, dropping a blank that directly follows a blank"""
+        if not section:
+            # A second blank in a row would only be collapsed again in build()
+            if not self._last_was_blank:
+                self.sections.append(section)
+                self._last_was_blank = True
+            return
+        self.sections.append(section)
+        self._last_was_blank = False
+        if '\n' in section:
+            self._has_newlines = True
     
     def add_header(self, title: str) -> 'TelegramMessageBuilder':
         """Add a bold header"""
-        self.sections.append(f"*{title}*")
+        self._append(f"*{title}*")
         return self
     
     def add_text(self, text: str) -> 'TelegramMessageBuilder':
         """Add plain text"""
-        self.sections.append(text)
+        self._append(text)
         return self
     
     def add_italic(self, text: str) -> 'TelegramMessageBuilder':
         """Add italicized text"""
-        self.sections.append(f"_{text}_")
+        self._append(f"_{text}_")
         return self
     
     def add_code(self, code: str, language: str = "") -> 'TelegramMessageBuilder':
         """Add code block"""
         if language:
-            self.sections.append(f"```{language}\n{code}\n```")
+            self._append(f"```{language}\n{code}\n```")
         else:
-            self.sections.append(f"```\n{code}\n```")
+            self._append(f"```\n{code}\n```")
         return self
     
     def add_list(self, items: list) -> 'TelegramMessageBuilder':
         """Add bulleted list"""
         for item in items:
-            self.sections.append(f"• {item}")
+            self._append(f"• {item}")
         return self
     
     def add_link(self, text: str, url: str) -> 'TelegramMessageBuilder':
         """Add clickable link"""
-        self.sections.append(f"[{text}]({url})")
+        self._append(f"[{text}]({url})")
         return self
     
     def add_line_break(self) -> 'TelegramMessageBuilder':
         """Add blank line separator"""
-        self.sections.append("")
+        self._append("")
         return self
     
     def build(self) -> str:
         """Build final message"""
         # Join sections, removing empty strings except those used as separators
         result = "\n".join(self.sections)
-        # Clean up multiple blank lines
-        result = re.sub(r'\n\n\n+', '\n\n', result)
+        # Clean up multiple blank lines (only possible via multi-line sections)
+        if self._has_newlines:
+            result = _TRIPLE_NL_RE.sub('\n\n', result)
         return result.strip()
     
     def build_chunks(self, max_length: int = 4096) -> list:
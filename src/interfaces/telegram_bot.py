@@ -15,6 +15,47 @@ from src.core.telegram_formatter import TelegramFormatter, TelegramMessageBuilde
 
 logger = logging.getLogger(__name__)
 
+# Command replies never change, so build them once at import.
+# /start only varies by the user's name, filled in with str.format.
+_START_TEMPLATE = TelegramMessageBuilder() \
+    .add_text("Hello {name}! [OK]") \
+    .add_line_break() \
+    .add_text("I'm Orion, your personal cognitive augmentation assistant.") \
+    .add_line_break() \
+    .add_header("Commands") \
+    .add_list([
+        "/help - Show available commands",
+        "/reset - Clear conversation history",
+    ]) \
+    .add_line_break() \
+    .add_text("Just send me a message and I'll help!") \
+    .build()
+
+_HELP_MESSAGE = TelegramMessageBuilder() \
+    .add_header("AVAILABLE COMMANDS") \
+    .add_list([
+        "/start - Start the bot",
+        "/help - Show this help message",
+        "/reset - Clear conversation history",
+    ]) \
+    .add_line_break() \
+    .add_header("FEATURES") \
+    .add_list([
+        "[BRAIN] Context-aware responses",
+        "[BOOKS] Source citations",
+        "[HELP] Uncertainty markers",
+        "[CYCLE] Correction handling",
+    ]) \
+    .add_line_break() \
+    .add_text("Just send any message and I'll respond!") \
+    .build()
+
+_RESET_MESSAGE = TelegramMessageBuilder() \
+    .add_text("[CYCLE] Conversation history cleared!") \
+    .add_line_break() \
+    .add_text("Ready for a fresh start.") \
+    .build()
+
 
 class TelegramInterface:
     """Telegram bot interface for Orion MVP"""
@@ -30,13 +71,24 @@ class TelegramInterface:
         self.bot_token = bot_token
         self.message_processor = message_processor
         self.application: Optional[Application] = None
+        
+        # Building the application and registering handlers is synchronous
+        self._setup()
     
     async def initialize(self):
-        """Initialize and setup telegram handlers"""
+        """Kept for callers that await initialization; setup runs in __init__"""
+    
+    def _setup(self):
+        """Create the application and register telegram handlers"""
         logger.info("Initializing Telegram bot...")
         
         # Create application
-        self.application = Application.builder().token(self.bot_token).build()
+        self.application = (
+            Application.builder()
+            .token(self.bot_token)
+            .post_shutdown(self._post_shutdown)
+            .build()
+        )
         
         # Add handlers
         self.application.add_handler(CommandHandler("start", self.handle_start))
@@ -49,48 +101,22 @@ class TelegramInterface:
         logger.info("✓ Telegram handlers registered")
         logger.info("✓ Bot ready to receive messages")
     
+    async def _post_shutdown(self, application: Application):
+        """Flush message storage and close LLM connections before the polling loop closes"""
+        try:
+            await self.message_processor.shutdown()
+        except Exception as e:
+            logger.error("Error shutting down message processor: %s", e)
+    
     async def handle_start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command"""
         user_name = update.effective_user.first_name
         
-        message = TelegramMessageBuilder() \
-            .add_text(f"Hello {user_name}! [OK]") \
-            .add_line_break() \
-            .add_text("I'm Orion, your personal cognitive augmentation assistant.") \
-            .add_line_break() \
-            .add_header("Commands") \
-            .add_list([
-                "/help - Show available commands",
-                "/reset - Clear conversation history",
-            ]) \
-            .add_line_break() \
-            .add_text("Just send me a message and I'll help!") \
-            .build()
-        
-        await update.message.reply_text(message)
+        await update.message.reply_text(_START_TEMPLATE.format(name=user_name))
     
     async def handle_help(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /help command"""
-        message = TelegramMessageBuilder() \
-            .add_header("AVAILABLE COMMANDS") \
-            .add_list([
-                "/start - Start the bot",
-                "/help - Show this help message",
-                "/reset - Clear conversation history",
-            ]) \
-            .add_line_break() \
-            .add_header("FEATURES") \
-            .add_list([
-                "[BRAIN] Context-aware responses",
-                "[BOOKS] Source citations",
-                "[HELP] Uncertainty markers",
-                "[CYCLE] Correction handling",
-            ]) \
-            .add_line_break() \
-            .add_text("Just send any message and I'll respond!") \
-            .build()
-        
-        await update.message.reply_text(message)
+        await update.message.reply_text(_HELP_MESSAGE)
     
     async def handle_reset(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /reset command"""
@@ -99,13 +125,7 @@ class TelegramInterface:
         # Clear user context from message processor if needed
         # TODO: Implement conversation reset in Phase 2
         
-        message = TelegramMessageBuilder() \
-            .add_text("[CYCLE] Conversation history cleared!") \
-            .add_line_break() \
-            .add_text("Ready for a fresh start.") \
-            .build()
-        
-        await update.message.reply_text(message)
+        await update.message.reply_text(_RESET_MESSAGE)
     
     async def handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle regular messages from users"""
@@ -130,11 +150,10 @@ class TelegramInterface:
             # Format response for Telegram
             formatted_response = TelegramFormatter.format_response(response, include_sources=True)
             
-            # Split into chunks if response is too long (Telegram limit: 4096 chars)
-            message_chunks = TelegramFormatter.truncate_message(formatted_response, max_length=4096)
-            
+            # Split into chunks if response is too long (Telegram limit: 4096 chars),
+            # slicing each one only after the previous one has been sent.
             # Send each chunk as separate message (plain text to avoid markdown parsing errors)
-            for chunk in message_chunks:
+            for chunk in TelegramFormatter.iter_chunks(formatted_response, max_length=4096):
                 await update.message.reply_text(chunk)
             
         except Exception as e:
@@ -144,21 +163,19 @@ class TelegramInterface:
             error_text = f"Error: {str(e)}"
             await update.message.reply_text(error_text)
     
-    def run(self):
+    def run(self, close_loop: bool = True):
         """Run the bot - BLOCKING (synchronous)
         
-        This method creates and runs its own event loop.
+        Polling runs on the current event loop (a new one if none is set).
         Call this from the main thread, not from async context.
-        """
-        import asyncio
-        
-        if not self.application:
-            # Initialize synchronously if not already done
-            asyncio.run(self.initialize())
         
+        Args:
+            close_loop: Close the event loop when polling stops. Pass False
+                to keep using the loop afterwards (e.g. for shutdown).
+        """
         logger.info("Starting Telegram bot polling...")
         logger.info("Bot is now listening for messages...")
         logger.info("Press Ctrl+C to stop")
         
         # This is the proper way to run: from sync context
-        self.application.run_polling()
+        self.application.run_polling(close_loop=close_loop)
@@ -1,22 +1,21 @@
 """Ollama LLM Client for local LLM inference"""
 
+import httpx
 import ollama
 import logging
 import re
 import os
 from typing import Dict, Any, List, Tuple
-from dataclasses import dataclass
+from src.core.response_enhancer import Source, SourceType
 
 logger = logging.getLogger(__name__)
 
-
-@dataclass
-class Source:
-    """Source of information used in response"""
-    type: str  # 'core', 'conversation', 'vault'
-    name: str = ""
-    file: str = ""
-    days_ago: int = 0
+# Section markers the context builder writes into the system prompt,
+# found in one scan instead of one substring search each
+_SECTION_MARKERS_RE = re.compile(
+    r'USER IDENTITY|core-identity\.md|RECENT CONVERSATION|RELEVANT PAST CONTEXT|ACTIVE PROJECTS'
+)
+_VAULT_FILE_RE = re.compile(r'## ([^\n]+\.md)')
 
 
 class OllamaClient:
@@ -33,6 +32,9 @@ class OllamaClient:
                 - model: Model name (from OLLAMA_MODEL env var or config)
                 - temperature: Response temperature (0.0-1.0)
                 - base_url: Ollama API URL
+                - timeout: Request timeout in seconds (default 60)
+                - max_response_chars: Stop generation once the reply
+                  reaches this length (default 0 = no limit)
         """
         # Use config if provided, otherwise use environment variables
         if config is None:
@@ -48,11 +50,18 @@ class OllamaClient:
             )
 
         self.temperature = config.get('temperature', 0.7)
+        self.max_response_chars = config.get('max_response_chars', 0)
+        # Same generation options for every request; built once, never mutated
+        self._options = {'temperature': self.temperature}
         self.base_url = config.get('base_url') or os.getenv('OLLAMA_HOST', 'http://127.0.0.1:11434')
 
-        # Set Ollama host from environment if provided
-        if 'OLLAMA_HOST' in os.environ:
-            ollama.host = self.base_url
+        # One shared async client per process: keeps HTTP connections to
+        # Ollama alive across requests instead of reconnecting per message
+        self._client = ollama.AsyncClient(
+            host=self.base_url,
+            timeout=config.get('timeout', 60.0),
+            limits=httpx.Limits(max_keepalive_connections=8)
+        )
 
         logger.info(f"Initialized Ollama client")
         logger.info(f"  Model: {self.model}")
@@ -74,18 +83,33 @@ class OllamaClient:
         """
         
         try:
-            response = ollama.chat(
+            # Stream tokens: the timeout then applies per chunk rather than to
+            # the whole generation, and an over-long reply can be cut short
+            stream = await self._client.chat(
                 model=self.model,
                 messages=[
                     {'role': 'system', 'content': system_prompt},
                     {'role': 'user', 'content': user_message}
                 ],
-                options={
-                    'temperature': self.temperature
-                }
+                options=self._options,
+                stream=True
             )
             
-            response_text = response['message']['content']
+            parts = []
+            length = 0
+            limit = self.max_response_chars
+            async for chunk in stream:
+                content = chunk['message']['content']
+                parts.append(content)
+                length += len(content)
+                if limit and length >= limit:
+                    # Early abort: closing the stream drops the connection,
+                    # which makes Ollama stop generating
+                    await stream.aclose()
+                    logger.debug("Response cut at %d chars (limit %d)", length, limit)
+                    break
+            
+            response_text = ''.join(parts)
             
             # Extract sources from system prompt
             sources = self._extract_sources_from_prompt(system_prompt)
@@ -98,29 +122,43 @@ class OllamaClient:
             logger.error(f"Ollama generation failed: {e}")
             raise
     
+    async def close(self):
+        """Close pooled HTTP connections to Ollama"""
+        # ollama.AsyncClient has no public close(); its httpx client is the
+        # private _client attribute, so look it up defensively
+        aclose = getattr(getattr(self._client, '_client', None), 'aclose', None)
+        if aclose is None:
+            logger.warning(
+                "Cannot close Ollama HTTP connections: %s has no _client.aclose(); "
+                "they will be closed at process exit",
+                type(self._client).__name__
+            )
+            return
+        await aclose()
+    
     def _extract_sources_from_prompt(self, prompt: str) -> List[Source]:
         """
         Extract what sources were included in the prompt
         """
         sources = []
+        markers = set(_SECTION_MARKERS_RE.findall(prompt))
         
-        # Check for core identity (note: context builder now uses 'USER IDENTITY')
-        if 'CORE IDENTITY' in prompt or 'USER IDENTITY' in prompt or 'core-identity.md' in prompt:
-            sources.append(Source(type='core', name='preferences'))
+        # Check for core identity
+        if 'USER IDENTITY' in markers or 'core-identity.md' in markers:
+            sources.append(Source(type=SourceType.CORE, name='preferences'))
         
         # Check for conversation buffer
-        if 'RECENT CONVERSATION' in prompt:
-            sources.append(Source(type='conversation', days_ago=0))
+        if 'RECENT CONVERSATION' in markers:
+            sources.append(Source(type=SourceType.CONVERSATION, days_ago=0))
         
         # Check for past context
-        if 'RELEVANT PAST CONTEXT' in prompt:
+        if 'RELEVANT PAST CONTEXT' in markers:
             # Simple heuristic: assume recent if in past context
-            sources.append(Source(type='conversation', days_ago=7))
+            sources.append(Source(type=SourceType.CONVERSATION, days_ago=7))
         
         # Check for vault files
-        if 'ACTIVE PROJECTS' in prompt:
-            files = re.findall(r'## ([^\n]+\.md)', prompt)
-            for file in files:
-                sources.append(Source(type='vault', file=file))
+        if 'ACTIVE PROJECTS' in markers:
+            for file in _VAULT_FILE_RE.findall(prompt):
+                sources.append(Source(type=SourceType.VAULT, file=file))
         
         return sources
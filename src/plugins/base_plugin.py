@@ -1,7 +1,7 @@
 """Base plugin interface for Orion"""
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,6 +10,9 @@ logger = logging.getLogger(__name__)
 class BasePlugin(ABC):
     """Base class for all Orion plugins"""
     
+    # Instance attribute once set; see PluginManager.set_enabled
+    _enabled: bool = True
+    
     @property
     @abstractmethod
     def name(self) -> str:
@@ -19,7 +22,11 @@ class BasePlugin(ABC):
     @property
     def enabled(self) -> bool:
         """Whether plugin is enabled"""
-        return True
+        return self._enabled
+    
+    @enabled.setter
+    def enabled(self, value: bool):
+        self._enabled = value
     
     async def initialize(self, config: Dict[str, Any]):
         """
@@ -43,6 +50,24 @@ class BasePlugin(ABC):
         """
         return None
     
+    async def process_batch(self, items: List[Tuple[str, Dict[str, Any]]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Process several messages at once (storage plugins)
+        
+        Storage plugins can override this to collapse N writes into one.
+        The default calls process() for each item in order.
+        
+        Args:
+            items: List of (message, metadata) tuples
+        
+        Returns:
+            One processing result (or None) per item
+        """
+        results = []
+        for message, metadata in items:
+            results.append(await self.process(message, metadata))
+        return results
+    
     async def retrieve(self, query: str, context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Retrieve relevant information for context (retrieval plugins)
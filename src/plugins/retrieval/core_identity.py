@@ -1,13 +1,21 @@
 """Core Identity Plugin for reading user preferences and context"""
 
 import logging
-from typing import Dict, Any, Optional
+import re
+from typing import Dict, Any, Optional, Tuple
 from pathlib import Path
 
 from src.plugins.base_plugin import BasePlugin
 
 logger = logging.getLogger(__name__)
 
+# One "## Heading" section: heading text, then everything up to the next
+# "## " line or the end of the file
+_SECTION_RE = re.compile(r'^## ([^\n]*)\n?(.*?)(?=^## |\Z)', re.MULTILINE | re.DOTALL)
+
+# Heading text -> identity key: spaces become underscores
+_KEY_TRANS = str.maketrans(' ', '_')
+
 
 class CoreIdentityPlugin(BasePlugin):
     """Read and retrieve user identity/preferences from vault"""
@@ -16,6 +24,10 @@ class CoreIdentityPlugin(BasePlugin):
         """Initialize core identity plugin"""
         self.identity_file: Optional[Path] = None
         self.core_identity: Dict[str, Any] = {}
+        # (st_mtime_ns, st_size) of the file behind core_identity, and its
+        # stripped text; the file is only re-read when the stat key changes
+        self._cached_stat_key: Optional[Tuple[int, int]] = None
+        self._cached_text: Optional[str] = None
     
     @property
     def name(self) -> str:
@@ -84,8 +96,8 @@ class CoreIdentityPlugin(BasePlugin):
             Dict with user identity information
         """
         try:
-            # Reload identity to get latest changes
-            if self.identity_file and self.identity_file.exists():
+            # Reload identity to get latest changes (a stat when unchanged)
+            if self.identity_file:
                 await self._load_identity()
             
             # Format identity for context builder
@@ -101,10 +113,18 @@ class CoreIdentityPlugin(BasePlugin):
             return None
     
     async def _load_identity(self):
-        """Load and parse core identity file"""
+        """Load and parse core identity file, unless unchanged since last load"""
         try:
-            if not self.identity_file.exists():
-                logger.warning(f"Identity file not found: {self.identity_file}")
+            try:
+                st = self.identity_file.stat()
+            except FileNotFoundError:
+                # Keep the parsed fields but stop serving the vanished file's text
+                self._cached_stat_key = None
+                self._cached_text = None
+                return
+            
+            stat_key = (st.st_mtime_ns, st.st_size)
+            if stat_key == self._cached_stat_key:
                 return
             
             # Read with UTF-8 encoding to handle special characters
@@ -112,12 +132,16 @@ class CoreIdentityPlugin(BasePlugin):
             
             # Parse markdown format
             self.core_identity = self._parse_identity_markdown(content)
+            self._cached_text = content.strip()
+            self._cached_stat_key = stat_key
             
             logger.debug(f"Loaded identity with keys: {list(self.core_identity.keys())}")
         
         except Exception as e:
             logger.error(f"Failed to load identity file: {e}")
             self.core_identity = {}
+            self._cached_stat_key = None
+            self._cached_text = None
     
     def _parse_identity_markdown(self, content: str) -> Dict[str, Any]:
         """
@@ -146,27 +170,11 @@ class CoreIdentityPlugin(BasePlugin):
         """
         identity = {}
         
-        lines = content.split('\n')
-        current_section = None
-        current_content = []
-        
-        for line in lines:
-            # Check for section header
-            if line.startswith('## '):
-                # Save previous section
-                if current_section:
-                    identity[current_section] = '\n'.join(current_content).strip()
-                
-                # Start new section
-                current_section = line[3:].strip().lower().replace(' ', '_')
-                current_content = []
-            
-            elif current_section:
-                current_content.append(line)
-        
-        # Save final section
-        if current_section:
-            identity[current_section] = '\n'.join(current_content).strip()
+        # One regex pass; later sections with the same heading win
+        for match in _SECTION_RE.finditer(content):
+            section = match.group(1).strip().lower().translate(_KEY_TRANS)
+            if section:
+                identity[section] = match.group(2).strip()
         
         return identity
     
@@ -176,14 +184,9 @@ class CoreIdentityPlugin(BasePlugin):
             return "No user identity information available."
         
         # For the main markdown file, return the full structured content
-        # This preserves sections, subsections, and lists
-        identity_file = Path(self.identity_file)
-        if identity_file.exists():
-            try:
-                content = identity_file.read_text(encoding='utf-8')
-                return content.strip()
-            except Exception:
-                pass
+        # (as read by _load_identity). This preserves sections, subsections, and lists
+        if self._cached_text is not None:
+            return self._cached_text
         
         # Fallback to simple format
         lines = []
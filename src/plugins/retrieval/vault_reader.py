@@ -1,13 +1,32 @@
 """Vault Reader Plugin for reading project notes and files"""
 
 import logging
-from typing import Dict, Any, Optional, List
+import mmap
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Any, Iterator, Optional, List, Tuple
 from pathlib import Path
 
 from src.plugins.base_plugin import BasePlugin
 
 logger = logging.getLogger(__name__)
 
+# Index tokens: runs of lowercase letters, digits and underscores. Notes
+# are tokenized as bytes (case-folded per token), queries as text.
+_TOKEN_RE = re.compile(r"[a-z0-9_]+")
+_TOKEN_BYTES_RE = re.compile(rb"[A-Za-z0-9_]+")
+
+
+@dataclass
+class _IndexEntry:
+    """Indexed state of one vault file"""
+    mtime_ns: int
+    size: int
+    tokens: Counter
+    excerpt: str
+
 
 class VaultReaderPlugin(BasePlugin):
     """Read and retrieve project notes from the user's vault"""
@@ -16,7 +35,14 @@ class VaultReaderPlugin(BasePlugin):
         """Initialize vault reader"""
         self.vault_path: Optional[Path] = None
         self.projects_path: Optional[Path] = None
-        self.file_cache: Dict[str, str] = {}
+        self.preview_chars: int = 300
+        # Per-file index, plus token -> {file: count} posting lists over it.
+        # The index doubles as the vault's file cache: a note is re-read
+        # only when its (mtime_ns, size) changes.
+        self._index: Dict[Path, _IndexEntry] = {}
+        self._postings: Dict[str, Dict[Path, int]] = {}
+        self._cache_hits: int = 0
+        self._cache_misses: int = 0
     
     @property
     def name(self) -> str:
@@ -30,9 +56,11 @@ class VaultReaderPlugin(BasePlugin):
         Args:
             config: Configuration dict with:
                 - path: Path to vault directory
+                - preview_chars: Max excerpt length per file (default 300)
         """
         try:
             vault_path = config.get('path', 'vault')
+            self.preview_chars = config.get('preview_chars', 300)
             self.vault_path = Path(vault_path)
             self.projects_path = self.vault_path / 'projects'
             
@@ -45,7 +73,9 @@ class VaultReaderPlugin(BasePlugin):
                 logger.info(f"Creating projects directory: {self.projects_path}")
                 self.projects_path.mkdir(parents=True, exist_ok=True)
             
-            logger.info(f"Initialized vault reader at {self.vault_path}")
+            self._refresh_index()
+            
+            logger.info(f"Initialized vault reader at {self.vault_path} ({len(self._index)} files indexed)")
         
         except Exception as e:
             logger.error(f"Failed to initialize vault reader: {e}")
@@ -106,10 +136,102 @@ class VaultReaderPlugin(BasePlugin):
             logger.error(f"Vault search failed: {e}")
             return None
     
+    def _iter_md_with_stat(self) -> Iterator[Tuple[os.DirEntry, os.stat_result]]:
+        """
+        Yield (entry, stat) for each regular *.md file in projects_path
+        
+        scandir yields names and file types from one directory read, so the
+        only per-file syscall is the stat. Files that cannot be stat'ed
+        (e.g. deleted since the listing) are skipped.
+        """
+        with os.scandir(self.projects_path) as it:
+            for dir_entry in it:
+                if not (dir_entry.name.endswith('.md') and dir_entry.is_file()):
+                    continue
+                try:
+                    st = dir_entry.stat()
+                except OSError as e:
+                    logger.warning(f"Error reading vault file {dir_entry.path}: {e}")
+                    continue
+                yield dir_entry, st
+    
+    def _refresh_index(self):
+        """Bring the index up to date, re-reading only new or changed files"""
+        seen = set()
+        
+        for dir_entry, st in self._iter_md_with_stat():
+            file_path = Path(dir_entry.path)
+            seen.add(file_path)
+            try:
+                entry = self._index.get(file_path)
+                if entry is not None and entry.mtime_ns == st.st_mtime_ns and entry.size == st.st_size:
+                    self._cache_hits += 1
+                    continue
+                
+                self._cache_misses += 1
+                tokens, excerpt = self._read_note(file_path, st.st_size)
+            
+            except Exception as e:
+                logger.warning(f"Error reading vault file {file_path}: {e}")
+                self._unindex_file(file_path)
+                continue
+            
+            self._unindex_file(file_path)
+            self._index[file_path] = _IndexEntry(st.st_mtime_ns, st.st_size, tokens, excerpt)
+            for token, count in tokens.items():
+                self._postings.setdefault(token, {})[file_path] = count
+        
+        # Drop files that were deleted or renamed
+        for file_path in [p for p in self._index if p not in seen]:
+            self._unindex_file(file_path)
+    
+    def _read_note(self, file_path: Path, size: int) -> Tuple[Counter, str]:
+        """
+        Tokenize a note and take its excerpt without decoding the whole file
+        
+        The file is memory-mapped and tokenized as bytes; only the head
+        needed for the excerpt is decoded.
+        
+        Returns:
+            (token counts, excerpt)
+        """
+        if size == 0:
+            return Counter(), ''
+        
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            tokens = Counter(t.lower().decode('ascii') for t in _TOKEN_BYTES_RE.findall(mm))
+            # A UTF-8 character is at most 4 bytes, so this head always
+            # decodes to at least preview_chars characters (when the file has them)
+            head_bytes = mm[:self.preview_chars * 4]
+        
+        # Excerpt: first 5 lines, capped at preview_chars. Only the head
+        # is decoded and split, not the whole file.
+        head = head_bytes.decode('utf-8', errors='replace')
+        head = head.replace('\r\n', '\n').replace('\r', '\n')[:self.preview_chars]
+        excerpt = '\n'.join(head.split('\n', 5)[:5])
+        
+        return tokens, excerpt
+    
+    def _unindex_file(self, file_path: Path):
+        """Remove a file and its postings from the index"""
+        entry = self._index.pop(file_path, None)
+        if entry is None:
+            return
+        
+        for token in entry.tokens:
+            posting = self._postings.get(token)
+            if posting is not None:
+                posting.pop(file_path, None)
+                if not posting:
+                    del self._postings[token]
+    
     async def _search_vault(self, query: str) -> List[Dict[str, Any]]:
         """
         Search vault files for query terms
         
+        A file matches when it contains every query token; relevance is the
+        summed frequency of those tokens in the file.
+        
         Args:
             query: Search query
         
@@ -118,34 +240,40 @@ class VaultReaderPlugin(BasePlugin):
         """
         try:
             matching = []
-            query_lower = query.lower()
             
-            # Get all markdown files
             if not self.projects_path.exists():
                 return matching
             
-            md_files = list(self.projects_path.glob('*.md'))
+            self._refresh_index()
             
-            for file_path in md_files[:10]:  # Limit to first 10 files
-                try:
-                    content = file_path.read_text()
-                    
-                    # Simple keyword matching
-                    if query_lower in content.lower():
-                        # Get excerpt (first 200 chars or next sentence)
-                        lines = content.split('\n')
-                        excerpt = '\n'.join(lines[:5])  # First 5 lines
-                        
-                        matching.append({
-                            'file': file_path.name,
-                            'path': f"vault/projects/{file_path.name}",
-                            'excerpt': excerpt[:300],
-                            'relevance': content.lower().count(query_lower)
-                        })
-                
-                except Exception as e:
-                    logger.warning(f"Error reading vault file {file_path}: {e}")
-                    continue
+            query_tokens = set(_TOKEN_RE.findall(query.lower()))
+            if not query_tokens:
+                return matching
+            
+            # Intersect posting lists, walking the shortest one
+            postings = []
+            for token in query_tokens:
+                posting = self._postings.get(token)
+                if not posting:
+                    return matching
+                postings.append(posting)
+            postings.sort(key=len)
+            shortest, rest = postings[0], postings[1:]
+            
+            for file_path, count in shortest.items():
+                relevance = count
+                for posting in rest:
+                    other = posting.get(file_path)
+                    if other is None:
+                        break
+                    relevance += other
+                else:
+                    matching.append({
+                        'file': file_path.name,
+                        'path': f"vault/projects/{file_path.name}",
+                        'excerpt': self._index[file_path].excerpt,
+                        'relevance': relevance
+                    })
             
             # Sort by relevance (highest first)
             matching.sort(key=lambda x: x['relevance'], reverse=True)
@@ -156,6 +284,15 @@ class VaultReaderPlugin(BasePlugin):
             logger.error(f"Error searching vault: {e}")
             return []
     
+    def cache_info(self) -> Dict[str, int]:
+        """Index/cache statistics, for debugging"""
+        return {
+            'hits': self._cache_hits,
+            'misses': self._cache_misses,
+            'files': len(self._index),
+            'tokens': len(self._postings)
+        }
+    
     async def get_vault_structure(self) -> Dict[str, Any]:
         """Get overview of vault structure"""
         try:
@@ -164,13 +301,13 @@ class VaultReaderPlugin(BasePlugin):
             
             # Count files
             all_files = list(self.vault_path.glob('**/*.md'))
-            project_files = list(self.projects_path.glob('*.md')) if self.projects_path.exists() else []
+            project_files = [e.name for e, _ in self._iter_md_with_stat()] if self.projects_path.exists() else []
             
             return {
                 'total_files': len(all_files),
                 'project_files': len(project_files),
                 'vault_path': str(self.vault_path),
-                'projects': [f.name for f in project_files[:10]]
+                'projects': project_files[:10]
             }
         
         except Exception as e:
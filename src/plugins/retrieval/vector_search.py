@@ -1,12 +1,17 @@
 """Vector Search Plugin for semantic search through conversation history"""
 
 import logging
+import operator
 from typing import Dict, Any, Optional
 
 from src.plugins.base_plugin import BasePlugin
 
 logger = logging.getLogger(__name__)
 
+# Vector DB result fields, and the keys they are renamed to for callers
+_RESULT_FIELDS = operator.itemgetter('message', 'score', 'timestamp', 'message_type')
+_RESULT_KEYS = ('message', 'similarity', 'timestamp', 'type')
+
 
 class VectorSearchPlugin(BasePlugin):
     """Semantic search through past messages using vector DB"""
@@ -62,7 +67,8 @@ class VectorSearchPlugin(BasePlugin):
         
         Args:
             query: Search query text
-            context: Context dict (may contain search_limit override)
+            context: Context dict (may contain search_limit override, and
+                user_id to search only that user's messages)
         
         Returns:
             Dict with search results
@@ -77,21 +83,19 @@ class VectorSearchPlugin(BasePlugin):
             
             # Call vector DB plugin's retrieve
             search_context = {'search_limit': search_limit}
+            if context.get('user_id') is not None:
+                search_context['user_id'] = context['user_id']
             db_results = await self.vector_db_plugin.retrieve(query, search_context)
             
             if not db_results or 'results' not in db_results:
                 logger.debug("No vector search results found")
                 return None
             
-            # Format results
-            formatted_results = []
-            for result in db_results['results']:
-                formatted_results.append({
-                    'message': result['message'],
-                    'similarity': result['score'],
-                    'timestamp': result['timestamp'],
-                    'type': result['message_type']
-                })
+            # Format results: one C-level field fetch per row
+            formatted_results = [
+                dict(zip(_RESULT_KEYS, _RESULT_FIELDS(result)))
+                for result in db_results['results']
+            ]
             
             logger.debug(f"Vector search found {len(formatted_results)} similar messages")
             
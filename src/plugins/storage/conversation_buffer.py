@@ -1,21 +1,89 @@
 """Conversation Buffer Plugin for maintaining recent message history"""
 
+import asyncio
+import itertools
 import logging
 import json
-from typing import Dict, Any, Optional
+import os
+import sys
+from dataclasses import asdict, dataclass
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 from pathlib import Path
 from datetime import datetime
 from collections import deque
 
 from src.plugins.base_plugin import BasePlugin
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 
+# dataclass(slots=True) needs Python 3.10; older interpreters keep __dict__
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+def _intern(value: Any) -> Any:
+    """Intern string values; other values (e.g. a None user_id) pass through"""
+    return sys.intern(value) if type(value) is str else value
+
+
+def _role_for(message_type: str) -> str:
+    """ContextBuilder role for a buffered message type"""
+    return 'user' if message_type == 'user' else 'assistant'
+
+
+@dataclass(**_DATACLASS_SLOTS)
+class BufferEntry:
+    """One buffered message"""
+    message: str
+    timestamp: Optional[str]
+    user_id: str
+    message_type: str
+    role: str
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'BufferEntry':
+        """Build an entry from its persisted form (older forms lack role)"""
+        # The few distinct type/user/role values are shared, not one
+        # string copy per parsed line
+        message_type = _intern(data.get('message_type', 'unknown'))
+        return cls(
+            message=data.get('message', ''),
+            timestamp=data.get('timestamp'),
+            user_id=_intern(data.get('user_id', 'unknown')),
+            message_type=message_type,
+            role=_intern(data.get('role')) or _role_for(message_type)
+        )
+
+
+def _dumps_line(entry: BufferEntry) -> bytes:
+    """Serialize one buffer entry as a JSONL line"""
+    if ORJSON_AVAILABLE:
+        # orjson serializes dataclasses natively
+        return orjson.dumps(entry) + b'\n'
+    return json.dumps(asdict(entry)).encode('utf-8') + b'\n'
+
+
+def _loads_line(line: bytes) -> Dict[str, Any]:
+    """Parse one JSONL line"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
 class ConversationBufferPlugin(BasePlugin):
     """
     Maintain a buffer of recent messages for context awareness
     Stores last N messages in memory and persists to disk
+    
+    Persistence is an append-only JSONL log: each save appends the new
+    entries, and the log is compacted (atomically rewritten to the current
+    buffer) once it holds more than twice max_size lines.
     """
     
     def __init__(self):
@@ -23,6 +91,18 @@ class ConversationBufferPlugin(BasePlugin):
         self.messages: deque = deque(maxlen=20)  # Keep last 20 messages
         self.buffer_file: Optional[Path] = None
         self.max_size: int = 20
+        # Saves are coalesced: the first change schedules one write after
+        # save_delay seconds, later changes in that window ride along
+        self.save_delay: float = 0.5
+        self._flush_task: Optional[asyncio.Task] = None
+        # Serializes every log write (flush task and shutdown); created in
+        # initialize so it belongs to the running loop
+        self._save_lock: Optional[asyncio.Lock] = None
+        # Entries not yet appended to the log, lines in the log, and the
+        # log's append handle
+        self._pending: List[BufferEntry] = []
+        self._log_lines: int = 0
+        self._append_fp = None
     
     @property
     def name(self) -> str:
@@ -37,20 +117,23 @@ class ConversationBufferPlugin(BasePlugin):
             config: Configuration dict with:
                 - size: Max messages to keep (default 20)
                 - path: Path to persist buffer (optional)
+                - save_delay: Seconds to coalesce saves over (default 0.5)
         """
         try:
             self.max_size = config.get('size', 20)
+            self.save_delay = config.get('save_delay', 0.5)
             self.messages = deque(maxlen=self.max_size)
+            self._save_lock = asyncio.Lock()
             
             # Optional: specify storage path for persistence
             storage_path = config.get('path', 'data/buffer')
             if storage_path:
-                self.buffer_file = Path(storage_path) / 'conversation_buffer.json'
+                self.buffer_file = Path(storage_path) / 'conversation_buffer.jsonl'
                 self.buffer_file.parent.mkdir(parents=True, exist_ok=True)
                 
                 # Load existing buffer if available
-                if self.buffer_file.exists():
-                    await self._load_buffer()
+                await self._load_buffer()
+                self._append_fp = open(self.buffer_file, 'ab', buffering=0)
             
             logger.info(f"Initialized conversation buffer (max_size={self.max_size})")
         
@@ -70,26 +153,13 @@ class ConversationBufferPlugin(BasePlugin):
             Dict with buffer info or None
         """
         try:
-            # Ensure timestamp
-            if 'timestamp' not in metadata:
-                metadata['timestamp'] = datetime.now().isoformat()
-            
-            # Create message entry
-            message_entry = {
-                'message': message,
-                'timestamp': metadata['timestamp'],
-                'user_id': metadata.get('user_id', 'unknown'),
-                'message_type': metadata.get('message_type', 'unknown')
-            }
-            
-            # Add to buffer
-            self.messages.append(message_entry)
+            self._append_entry(message, metadata)
             
             logger.debug(f"Added to buffer. Current size: {len(self.messages)}/{self.max_size}")
             
             # Persist if configured
             if self.buffer_file:
-                await self._save_buffer()
+                self._schedule_save()
             
             return {
                 'buffered': True,
@@ -101,6 +171,58 @@ class ConversationBufferPlugin(BasePlugin):
             logger.error(f"Failed to add message to buffer: {e}")
             return None
     
+    async def process_batch(self, items: List[Tuple[str, Dict[str, Any]]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Add several messages to the buffer and persist once
+        
+        Args:
+            items: List of (message, metadata) tuples
+        
+        Returns:
+            One buffer info dict (or None on failure) per item
+        """
+        results = []
+        for message, metadata in items:
+            try:
+                self._append_entry(message, metadata)
+                results.append({
+                    'buffered': True,
+                    'buffer_size': len(self.messages),
+                    'max_size': self.max_size
+                })
+            except Exception as e:
+                logger.error(f"Failed to add message to buffer: {e}")
+                results.append(None)
+        
+        logger.debug(f"Added {len(items)} messages to buffer. Current size: {len(self.messages)}/{self.max_size}")
+        
+        # Persist once for the whole batch
+        if self.buffer_file:
+            self._schedule_save()
+        
+        return results
+    
+    def _append_entry(self, message: str, metadata: Dict[str, Any]):
+        """Build a buffer entry from a message and append it"""
+        # Ensure timestamp
+        if 'timestamp' not in metadata:
+            metadata['timestamp'] = datetime.now().isoformat()
+        
+        # Create message entry; role is derived here once, not per retrieve
+        message_type = _intern(metadata.get('message_type', 'unknown'))
+        message_entry = BufferEntry(
+            message=message,
+            timestamp=metadata['timestamp'],
+            user_id=_intern(metadata.get('user_id', 'unknown')),
+            message_type=message_type,
+            role=_role_for(message_type)
+        )
+        
+        # Add to buffer
+        self.messages.append(message_entry)
+        if self.buffer_file:
+            self._pending.append(message_entry)
+    
     async def retrieve(self, query: str, context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Retrieve recent messages from buffer
@@ -115,17 +237,24 @@ class ConversationBufferPlugin(BasePlugin):
         try:
             count = context.get('count', 5)
             
-            # Get most recent N messages
-            recent = list(self.messages)[-count:] if self.messages else []
+            # Most recent N messages, newest-first from the deque's tail then
+            # flipped back to chronological order. count <= 0 keeps the
+            # slice semantics of messages[-count:] (0 = the whole buffer).
+            if count > 0:
+                tail = list(itertools.islice(reversed(self.messages), count))
+                tail.reverse()
+            else:
+                tail = itertools.islice(self.messages, -count, None)
             
-            # Convert to format expected by ContextBuilder
-            recent_messages = []
-            for msg in recent:
-                recent_messages.append({
-                    'role': 'user' if msg.get('message_type') == 'user' else 'assistant',
-                    'content': msg.get('message', ''),
-                    'timestamp': msg.get('timestamp')
-                })
+            # Convert to the format expected by ContextBuilder
+            recent_messages = [
+                {
+                    'role': msg.role,
+                    'content': msg.message,
+                    'timestamp': msg.timestamp
+                }
+                for msg in tail
+            ]
             
             logger.debug(f"Retrieved {len(recent_messages)} recent messages from buffer")
             
@@ -138,61 +267,153 @@ class ConversationBufferPlugin(BasePlugin):
             logger.error(f"Failed to retrieve from buffer: {e}")
             return None
     
+    def _schedule_save(self):
+        """Schedule a coalesced save unless one is already pending"""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._debounced_flush())
+    
+    async def _debounced_flush(self):
+        """Wait out the save window, then persist the buffer once"""
+        # Entries buffered while a write was in flight get another window
+        while self._pending:
+            await asyncio.sleep(self.save_delay)
+            await self._save_buffer()
+    
     async def _save_buffer(self):
-        """Persist buffer to disk"""
-        if not self.buffer_file:
+        """
+        Append pending entries to the log, compacting it when it grows
+        
+        Serialization and file I/O run in a worker thread; the entries to
+        write are snapshotted here, on the event loop.
+        """
+        if not self.buffer_file or not self._pending:
             return
         
         try:
-            buffer_data = {
-                'messages': list(self.messages),
-                'count': len(self.messages),
-                'saved_at': datetime.now().isoformat()
-            }
-            
-            with open(self.buffer_file, 'w') as f:
-                json.dump(buffer_data, f, indent=2)
-            
-            logger.debug(f"Saved buffer to {self.buffer_file}")
+            async with self._save_lock:
+                pending = self._pending
+                self._pending = []
+                if not pending:
+                    return
+                
+                if self._log_lines + len(pending) > 2 * self.max_size:
+                    await asyncio.to_thread(self._compact_log, list(self.messages))
+                else:
+                    await asyncio.to_thread(self._append_lines, pending)
         
         except Exception as e:
             logger.error(f"Failed to save buffer: {e}")
     
+    def _append_lines(self, entries: List[BufferEntry]):
+        """Append entries to the log (blocking)"""
+        self._append_fp.write(b''.join(map(_dumps_line, entries)))
+        self._log_lines += len(entries)
+        
+        logger.debug(f"Appended {len(entries)} entries to {self.buffer_file}")
+    
+    def _compact_log(self, entries: Sequence[BufferEntry]):
+        """
+        Atomically rewrite the log to hold just entries (blocking)
+        
+        When called from a worker thread entries must be a snapshot; on the
+        event loop the deque itself can be passed without copying.
+        """
+        tmp_file = self.buffer_file.with_name(self.buffer_file.name + '.tmp')
+        tmp_file.write_bytes(b''.join(map(_dumps_line, entries)))
+        
+        if self._append_fp is not None:
+            self._append_fp.close()
+        os.replace(tmp_file, self.buffer_file)
+        self._append_fp = open(self.buffer_file, 'ab', buffering=0)
+        
+        self._log_lines = len(entries)
+        
+        logger.debug(f"Compacted buffer log {self.buffer_file} to {self._log_lines} entries")
+    
     async def _load_buffer(self):
         """Load buffer from disk"""
-        if not self.buffer_file or not self.buffer_file.exists():
+        if not self.buffer_file:
             return
         
         try:
-            with open(self.buffer_file, 'r') as f:
-                buffer_data = json.load(f)
+            if not self.buffer_file.exists():
+                await self._load_legacy_buffer()
+                return
             
-            messages = buffer_data.get('messages', [])
+            # Only the last max_size lines are parsed
+            tail = deque(maxlen=self.max_size)
+            with open(self.buffer_file, 'rb') as f:
+                for line in f:
+                    self._log_lines += 1
+                    tail.append(line)
             
-            # Add messages back to buffer
-            for msg in messages[-self.max_size:]:  # Only keep max_size
-                self.messages.append(msg)
+            needs_rewrite = False
+            for line in tail:
+                try:
+                    data = _loads_line(line)
+                except ValueError:
+                    # Torn final line from an interrupted write
+                    logger.warning(f"Skipping unreadable line in {self.buffer_file}")
+                    continue
+                needs_rewrite |= 'role' not in data
+                self.messages.append(BufferEntry.from_dict(data))
+            
+            # Rewrite a log with a torn tail so appends start on a fresh
+            # line, or with entries from before roles were stored
+            if needs_rewrite or (tail and not tail[-1].endswith(b'\n')):
+                self._compact_log(self.messages)
             
             logger.info(f"Loaded {len(self.messages)} messages from buffer file")
         
         except Exception as e:
             logger.error(f"Failed to load buffer: {e}")
     
+    async def _load_legacy_buffer(self):
+        """Import a conversation_buffer.json snapshot from older versions"""
+        legacy_file = self.buffer_file.with_suffix('.json')
+        if not legacy_file.exists():
+            return
+        
+        with open(legacy_file, 'r') as f:
+            buffer_data = json.load(f)
+        
+        messages = buffer_data.get('messages', [])
+        
+        # Add messages back to buffer
+        for msg in messages[-self.max_size:]:  # Only keep max_size
+            self.messages.append(BufferEntry.from_dict(msg))
+        
+        # Seed the log with the imported messages
+        self._compact_log(self.messages)
+        
+        logger.info(f"Imported {len(self.messages)} messages from {legacy_file}")
+    
     def get_buffer_stats(self) -> Dict[str, Any]:
         """Get buffer statistics"""
+        size = len(self.messages)
         return {
-            'current_size': len(self.messages),
+            'current_size': size,
             'max_size': self.max_size,
-            'utilization': f"{len(self.messages) / self.max_size * 100:.1f}%",
+            'utilization': f"{size / self.max_size * 100:.1f}%",
             'persisted': self.buffer_file is not None
         }
     
     async def shutdown(self):
         """Cleanup on shutdown"""
         try:
-            # Save buffer one last time
+            # Let a pending save finish; cancelling could leave its worker
+            # thread writing after the lock is released
+            if self._flush_task is not None:
+                await self._flush_task
+                self._flush_task = None
+            
+            # Save buffer one last time, as a compacted log
             if self.buffer_file:
-                await self._save_buffer()
+                async with self._save_lock:
+                    self._pending = []
+                    await asyncio.to_thread(self._compact_log, list(self.messages))
+                    self._append_fp.close()
+                    self._append_fp = None
             
             stats = self.get_buffer_stats()
             logger.info(f"Buffer shutdown. Stats: {stats}")
@@ -1,13 +1,22 @@
 """Vector Database Plugin for storing message embeddings"""
 
+import asyncio
+import hashlib
 import logging
-from typing import Dict, Any, Optional, List
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
 from pathlib import Path
 from datetime import datetime
 
 try:
-    from qdrant_client import QdrantClient
+    import numpy as np
+    from qdrant_client import AsyncQdrantClient
     from qdrant_client.models import Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue
+    from qdrant_client.models import (
+        ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+        QuantizationSearchParams, SearchParams, HnswConfigDiff, OptimizersConfigDiff,
+        PayloadSchemaType
+    )
     from sentence_transformers import SentenceTransformer
     QDRANT_AVAILABLE = True
 except ImportError:
@@ -18,18 +27,79 @@ from src.plugins.base_plugin import BasePlugin
 
 logger = logging.getLogger(__name__)
 
+# Query text -> embedding entries kept (LRU), and recent result sets kept
+# for near-duplicate queries
+_QUERY_CACHE_SIZE = 1024
+_RESULT_CACHE_SIZE = 64
+
+_EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+
+# Payload fields searches can be filtered on (exact match, keyword-indexed)
+_FILTER_FIELDS = ('user_id', 'message_type')
+
+# Stored message excerpt size, in UTF-8 bytes
+_MAX_PAYLOAD_BYTES = 500
+
+
+def _content_hash(encoded: bytes) -> int:
+    """
+    Stable 64-bit hash of a UTF-8 encoded message, for deduplication
+    
+    Unlike the builtin hash(), which is salted per process, this matches
+    across restarts. Signed so it fits Qdrant's int64 payload values.
+    """
+    digest = hashlib.blake2b(encoded, digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+def _payload_excerpt(message: str, encoded: bytes) -> str:
+    """
+    Message excerpt of at most _MAX_PAYLOAD_BYTES UTF-8 bytes
+    
+    Short messages are stored as-is; long ones are cut on a byte boundary,
+    dropping any character split by the cut.
+    """
+    if len(encoded) <= _MAX_PAYLOAD_BYTES:
+        return message
+    return encoded[:_MAX_PAYLOAD_BYTES].decode('utf-8', errors='ignore')
+
 
 class VectorDBPlugin(BasePlugin):
     """Store and retrieve message embeddings using Qdrant vector database"""
     
     def __init__(self):
         """Initialize vector DB plugin"""
-        self.client: Optional[QdrantClient] = None
+        self.client: Optional[AsyncQdrantClient] = None
         self.embedder: Optional[SentenceTransformer] = None
         self.collection_name: str = "conversations"
         self.vector_size: int = 384  # all-MiniLM-L6-v2 dimension
         self.db_path: str = "data/vector_db"
+        self.url: Optional[str] = None
+        self.encode_batch_size: int = 32
+        self.embedding_backend: str = "torch"
+        self.embedding_model_file: Optional[str] = None
+        self.encode_threads: int = 0
+        self.quantization: bool = True
+        self.on_disk: bool = True
+        self.hnsw_ef: int = 64
+        self._search_params: Optional[SearchParams] = None
+        self._collection_info = None
         self._message_counter = 0
+        # Normalized query embeddings by exact query text; always valid
+        self._query_vectors: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        # Encodes in flight by query text, so concurrent retrievals of the
+        # same query (e.g. vector_search and vector_db in one build_context)
+        # share one encoder call
+        self._pending_queries: Dict[str, "asyncio.Task"] = {}
+        # Recent searches: stacked normalized query vectors (one row per
+        # entry) and their ((search_limit, filter), results). Cleared on every write,
+        # since new points can change any result set. Opt-in: with a write
+        # after every turn it only pays off for read-heavy use.
+        self.semantic_cache_threshold: Optional[float] = None
+        self._result_vectors: Optional["np.ndarray"] = None
+        self._result_entries: List[Tuple[Tuple, List[Dict[str, Any]]]] = []
+        # Bumped on every write, so a search that overlapped one is not cached
+        self._write_generation: int = 0
     
     @property
     def name(self) -> str:
@@ -42,8 +112,29 @@ class VectorDBPlugin(BasePlugin):
         
         Args:
             config: Configuration dict with:
-                - path: Path to vector DB
+                - path: Path to vector DB (embedded local mode)
+                - url: Qdrant server URL (spoken to over gRPC); used instead
+                  of path when set
                 - collection: Collection name
+                - encode_batch_size: Encoder batch size (default 32)
+                - embedding_backend: "torch" (default), or "onnx" for ONNX
+                  Runtime (needs sentence-transformers[onnx] >= 3.2)
+                - embedding_model_file: ONNX file within the model repo,
+                  e.g. "onnx/model_qint8_avx512_vnni.onnx" (int8)
+                - encode_threads: Encoder intra-op threads (default 0 =
+                  the runtime's own default)
+                - semantic_cache_threshold: Cosine similarity at which a
+                  recent search's results are reused, e.g. 0.97 (default
+                  None = no result cache; when set, writes wait for the
+                  server to apply them)
+                - quantization: Store int8-quantized vectors for search,
+                  rescored with the originals (default True; server mode
+                  only, applies to newly created collections)
+                - on_disk: Keep the HNSW graph, payloads and (past 20k
+                  points) vectors memory-mapped on disk (default True;
+                  server mode only, new collections)
+                - hnsw_ef: HNSW search breadth, trading recall for latency
+                  (default 64; server mode only)
         """
         if not QDRANT_AVAILABLE:
             logger.error("Qdrant or sentence-transformers not installed")
@@ -52,37 +143,123 @@ class VectorDBPlugin(BasePlugin):
         try:
             self.db_path = config.get('path', 'data/vector_db')
             self.collection_name = config.get('collection', 'conversations')
+            self.encode_batch_size = config.get('encode_batch_size', 32)
+            self.embedding_backend = config.get('embedding_backend', 'torch')
+            self.embedding_model_file = config.get('embedding_model_file')
+            self.encode_threads = config.get('encode_threads', 0)
+            self.semantic_cache_threshold = config.get('semantic_cache_threshold')
+            self.url = config.get('url')
+            # Local mode is exact brute-force search without quantization
+            self.quantization = config.get('quantization', True) and self.url is not None
+            self.on_disk = config.get('on_disk', True)
+            self.hnsw_ef = config.get('hnsw_ef', 64)
             
-            # Create DB directory
-            Path(self.db_path).mkdir(parents=True, exist_ok=True)
+            if self.url is not None:
+                # Search the int8 copies, then rescore 2x the requested
+                # candidates against the full-precision vectors
+                quantization_params = None
+                if self.quantization:
+                    quantization_params = QuantizationSearchParams(ignore=False, rescore=True, oversampling=2.0)
+                self._search_params = SearchParams(hnsw_ef=self.hnsw_ef, quantization=quantization_params)
             
             # Initialize Qdrant client
-            self.client = QdrantClient(path=self.db_path)
-            logger.info(f"Initialized Qdrant at {self.db_path}")
+            if self.url:
+                # gRPC sends vectors as packed floats instead of JSON lists
+                self.client = AsyncQdrantClient(url=self.url, prefer_grpc=True)
+                logger.info(f"Connected to Qdrant at {self.url}")
+            else:
+                # Create DB directory
+                Path(self.db_path).mkdir(parents=True, exist_ok=True)
+                self.client = AsyncQdrantClient(path=self.db_path)
+                logger.info(f"Initialized Qdrant at {self.db_path}")
             
             # Initialize embedding model
-            self.embedder = SentenceTransformer('all-MiniLM-L6-v2')
-            logger.info("Loaded sentence-transformers model: all-MiniLM-L6-v2")
+            self.embedder = self._load_embedder()
             
             # Create collection if it doesn't exist
-            try:
-                self.client.get_collection(self.collection_name)
+            if await self.client.collection_exists(self.collection_name):
                 logger.info(f"Using existing collection: {self.collection_name}")
-            except Exception:
-                # Collection doesn't exist, create it
-                self.client.create_collection(
+            else:
+                quantization_config = None
+                if self.quantization:
+                    quantization_config = ScalarQuantization(
+                        scalar=ScalarQuantizationConfig(
+                            type=ScalarType.INT8,
+                            quantile=0.99,
+                            always_ram=True
+                        )
+                    )
+                
+                # Write-heavy, occasionally searched: keep the index and
+                # payloads on disk rather than resident in RAM
+                storage_kwargs = {}
+                if self.url is not None and self.on_disk:
+                    storage_kwargs = {
+                        'hnsw_config': HnswConfigDiff(m=16, ef_construct=128, on_disk=True),
+                        'optimizers_config': OptimizersConfigDiff(memmap_threshold=20000),
+                        'on_disk_payload': True
+                    }
+                
+                await self.client.create_collection(
                     collection_name=self.collection_name,
                     vectors_config=VectorParams(
                         size=self.vector_size,
                         distance=Distance.COSINE
-                    )
+                    ),
+                    quantization_config=quantization_config,
+                    **storage_kwargs
                 )
+                
+                # Keyword indexes let filtered searches prune inside the
+                # HNSW graph; embedded mode has no payload indexes
+                if self.url is not None:
+                    for field_name in _FILTER_FIELDS:
+                        await self.client.create_payload_index(
+                            collection_name=self.collection_name,
+                            field_name=field_name,
+                            field_schema=PayloadSchemaType.KEYWORD
+                        )
                 logger.info(f"Created new collection: {self.collection_name}")
+            
+            # Collection config does not change while we run; only the
+            # point count is re-queried for stats
+            self._collection_info = await self.client.get_collection(self.collection_name)
         
         except Exception as e:
             logger.error(f"Failed to initialize vector DB: {e}")
             raise
     
+    def _load_embedder(self) -> "SentenceTransformer":
+        """Load the embedding model on the configured inference backend"""
+        if self.embedding_backend == 'torch':
+            if self.encode_threads:
+                import torch
+                torch.set_num_threads(self.encode_threads)
+            embedder = SentenceTransformer(_EMBEDDING_MODEL)
+        else:
+            # ONNX Runtime (optionally an int8-quantized export shipped with
+            # the model) keeps the 384-dim output at a fraction of the CPU cost
+            model_kwargs = {}
+            if self.embedding_model_file:
+                model_kwargs['file_name'] = self.embedding_model_file
+            if self.encode_threads:
+                import onnxruntime
+                session_options = onnxruntime.SessionOptions()
+                session_options.intra_op_num_threads = self.encode_threads
+                model_kwargs['session_options'] = session_options
+            embedder = SentenceTransformer(
+                _EMBEDDING_MODEL,
+                backend=self.embedding_backend,
+                model_kwargs=model_kwargs
+            )
+        
+        # Warm up: the first forward pass pays for kernel selection and
+        # allocator growth; take that hit here instead of on a user message
+        embedder.encode(['warmup'] * 8, batch_size=8)
+        
+        logger.info(f"Loaded sentence-transformers model: {_EMBEDDING_MODEL} ({self.embedding_backend})")
+        return embedder
+    
     async def process(self, message: str, metadata: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Store message embedding in vector database
@@ -98,47 +275,98 @@ class VectorDBPlugin(BasePlugin):
             logger.warning("Vector DB not initialized")
             return None
         
+        # A single message is a batch of one; MessageProcessor normally
+        # queues turns and calls process_batch directly
+        results = await self.process_batch([(message, metadata)])
+        return results[0]
+    
+    async def process_batch(self, items: List[Tuple[str, Dict[str, Any]]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Embed several messages in one encoder call and store them in one upsert
+        
+        Args:
+            items: List of (message, metadata) tuples
+        
+        Returns:
+            One storage info dict (or None on failure) per item
+        """
+        if not self.client or not self.embedder:
+            logger.warning("Vector DB not initialized")
+            return [None] * len(items)
+        
+        if not items:
+            return []
+        
         try:
-            # Generate embedding
-            embedding = self.embedder.encode(message)
-            
-            # Create point ID (incremental)
-            self._message_counter += 1
-            point_id = self._message_counter
-            
-            # Add metadata timestamp if missing
-            if 'timestamp' not in metadata:
-                metadata['timestamp'] = datetime.now().isoformat()
-            
-            # Store point with embedding and payload
-            point = PointStruct(
-                id=point_id,
-                vector=embedding.tolist(),
-                payload={
-                    'message': message[:500],  # Store first 500 chars
-                    'timestamp': metadata.get('timestamp'),
-                    'user_id': metadata.get('user_id', 'unknown'),
-                    'message_type': metadata.get('message_type', 'unknown'),
-                    'full_message_hash': hash(message) % (10**9)  # For deduplication
-                }
+            # encode() sorts inputs by length internally, so each batch is
+            # padded only to its longest member
+            # Encoding is CPU-bound; run it off the event loop
+            embeddings = await asyncio.to_thread(
+                self.embedder.encode,
+                [message for message, _ in items],
+                batch_size=self.encode_batch_size,
+                convert_to_numpy=True
             )
+            points = [
+                self._build_point(message, metadata, embedding)
+                for (message, metadata), embedding in zip(items, embeddings)
+            ]
             
-            self.client.upsert(
+            # Invalidate as the write is sent, so no search overlapping it
+            # gets cached
+            self._write_generation += 1
+            self._clear_result_cache()
+            
+            # Don't block on the server applying the batch; MessageProcessor
+            # already coalesces writes and nothing reads them back
+            # synchronously. Only the opt-in result cache needs the batch
+            # applied before later searches can be cached.
+            await self.client.upsert(
                 collection_name=self.collection_name,
-                points=[point]
+                points=points,
+                wait=self._result_cache_enabled
             )
             
-            logger.debug(f"Stored message embedding: ID={point_id}, len={len(message)}")
+            logger.debug(f"Stored {len(points)} message embeddings in one batch")
             
-            return {
-                'stored': True,
-                'point_id': point_id,
-                'embedding_dim': len(embedding)
-            }
+            return [
+                {
+                    'stored': True,
+                    'point_id': point.id,
+                    'embedding_dim': len(embedding)
+                }
+                for point, embedding in zip(points, embeddings)
+            ]
         
         except Exception as e:
-            logger.error(f"Failed to store message embedding: {e}")
-            return None
+            logger.error(f"Failed to store message embeddings: {e}")
+            return [None] * len(items)
+    
+    def _build_point(self, message: str, metadata: Dict[str, Any], embedding) -> "PointStruct":
+        """Assign the next point ID and build the Qdrant point for a message"""
+        # Create point ID (incremental)
+        self._message_counter += 1
+        point_id = self._message_counter
+        
+        # Add metadata timestamp if missing
+        if 'timestamp' not in metadata:
+            metadata['timestamp'] = datetime.now().isoformat()
+        
+        # Encoded once for both the excerpt and the hash
+        encoded = message.encode('utf-8')
+        
+        # Store point with embedding and payload
+        return PointStruct(
+            id=point_id,
+            vector=embedding.tolist(),
+            payload={
+                'message': _payload_excerpt(message, encoded),
+                'timestamp': metadata.get('timestamp'),
+                'user_id': metadata.get('user_id', 'unknown'),
+                'message_type': metadata.get('message_type', 'unknown'),
+                'full_message_hash': _content_hash(encoded)  # For deduplication
+            }
+        )
     
     async def retrieve(self, query: str, context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
@@ -146,7 +374,8 @@ class VectorDBPlugin(BasePlugin):
         
         Args:
             query: Search query text
-            context: Context dict (may contain search_limit)
+            context: Context dict (may contain search_limit, and user_id
+                and/or message_type to restrict results to matching messages)
         
         Returns:
             Dict with search results
@@ -157,35 +386,65 @@ class VectorDBPlugin(BasePlugin):
         
         try:
             # Generate query embedding
-            query_embedding = self.embedder.encode(query)
+            query_embedding = await self._embed_query(query)
             
             # Search for similar messages
             search_limit = context.get('search_limit', 5)
+            filter_values = tuple(
+                (field_name, context[field_name])
+                for field_name in _FILTER_FIELDS
+                if context.get(field_name) is not None
+            )
+            query_filter = None
+            if filter_values:
+                query_filter = Filter(must=[
+                    FieldCondition(key=field_name, match=MatchValue(value=value))
+                    for field_name, value in filter_values
+                ])
+            search_key = (search_limit, filter_values)
             
-            search_results = self.client.query_points(
+            cached = self._cached_results(query_embedding, search_key)
+            if cached is not None:
+                logger.debug(f"Vector search served {len(cached)} results from cache")
+                # Copy: merged context lists may be extended in place
+                return {
+                    'query': query,
+                    'results': list(cached),
+                    'count': len(cached)
+                }
+            
+            generation = self._write_generation
+            search_results = (await self.client.query_points(
                 collection_name=self.collection_name,
-                query=query_embedding.tolist(),
+                query=query_embedding,
                 limit=search_limit,
-                score_threshold=0.3  # Min similarity threshold
-            ).points
+                query_filter=query_filter,
+                score_threshold=0.3,  # Min similarity threshold
+                search_params=self._search_params
+            )).points
             
-            # Format results
-            results = []
-            for scored_point in search_results:
-                results.append({
+            # Format results (payload bound once per point)
+            results = [
+                {
                     'id': scored_point.id,
                     'score': scored_point.score,
-                    'message': scored_point.payload.get('message', ''),
-                    'timestamp': scored_point.payload.get('timestamp'),
-                    'user_id': scored_point.payload.get('user_id'),
-                    'message_type': scored_point.payload.get('message_type')
-                })
+                    'message': payload.get('message', ''),
+                    'timestamp': payload.get('timestamp'),
+                    'user_id': payload.get('user_id'),
+                    'message_type': payload.get('message_type')
+                }
+                for scored_point in search_results
+                for payload in (scored_point.payload,)
+            ]
             
             logger.debug(f"Vector search returned {len(results)} results for query")
             
+            if self._result_cache_enabled and generation == self._write_generation:
+                self._cache_results(query_embedding, search_key, results)
+            
             return {
                 'query': query,
-                'results': results,
+                'results': list(results),
                 'count': len(results)
             }
         
@@ -193,18 +452,89 @@ class VectorDBPlugin(BasePlugin):
             logger.error(f"Vector search failed: {e}")
             return None
     
-    def get_collection_stats(self) -> Optional[Dict[str, Any]]:
+    async def _embed_query(self, query: str) -> "np.ndarray":
+        """Normalized query embedding, memoized by exact query text"""
+        vector = self._query_vectors.get(query)
+        if vector is not None:
+            self._query_vectors.move_to_end(query)
+            return vector
+        
+        task = self._pending_queries.get(query)
+        if task is None:
+            task = asyncio.create_task(self._encode_query(query))
+            self._pending_queries[query] = task
+            task.add_done_callback(lambda _: self._pending_queries.pop(query, None))
+        # Shielded: one cancelled caller must not cancel the others' encode
+        return await asyncio.shield(task)
+    
+    async def _encode_query(self, query: str) -> "np.ndarray":
+        """Encode one query off the event loop and add it to the LRU"""
+        vector = await asyncio.to_thread(
+            self.embedder.encode, query, convert_to_numpy=True, normalize_embeddings=True
+        )
+        self._query_vectors[query] = vector
+        if len(self._query_vectors) > _QUERY_CACHE_SIZE:
+            self._query_vectors.popitem(last=False)
+        return vector
+    
+    @property
+    def _result_cache_enabled(self) -> bool:
+        """Whether near-duplicate searches are served from the result cache"""
+        return self.semantic_cache_threshold is not None
+    
+    def _cached_results(self, query_vector: "np.ndarray", search_key: Tuple) -> Optional[List[Dict[str, Any]]]:
+        """Results of a recent search with a near-identical query and the same (limit, filter), if any"""
+        if self._result_vectors is None:
+            return None
+        
+        # Only entries for the same (limit, filter) are candidates
+        matches = np.fromiter(
+            (key == search_key for key, _ in self._result_entries),
+            dtype=bool, count=len(self._result_entries)
+        )
+        if not matches.any():
+            return None
+        
+        # Vectors are normalized, so one matrix-vector product gives the
+        # cosine similarity to every cached query
+        scores = np.where(matches, self._result_vectors @ query_vector, -np.inf)
+        best = int(scores.argmax())
+        if scores[best] < self.semantic_cache_threshold:
+            return None
+        
+        return self._result_entries[best][1]
+    
+    def _cache_results(self, query_vector: "np.ndarray", search_key: Tuple, results: List[Dict[str, Any]]):
+        """Remember a search's results, evicting the oldest entry when full"""
+        row = query_vector[np.newaxis, :]
+        if self._result_vectors is None:
+            self._result_vectors = row
+        else:
+            keep = _RESULT_CACHE_SIZE - 1
+            self._result_vectors = np.vstack((self._result_vectors[-keep:], row))
+            self._result_entries = self._result_entries[-keep:]
+        self._result_entries.append((search_key, results))
+    
+    def _clear_result_cache(self):
+        """Forget cached result sets (after the collection changed)"""
+        self._result_vectors = None
+        self._result_entries = []
+    
+    async def get_collection_stats(self) -> Optional[Dict[str, Any]]:
         """Get collection statistics"""
-        if not self.client:
+        if not self.client or not self._collection_info:
             return None
         
         try:
-            collection_info = self.client.get_collection(self.collection_name)
+            # Approximate count: served from the collection's counters
+            # instead of a scan
+            count = await self.client.count(self.collection_name, exact=False)
             return {
                 'collection_name': self.collection_name,
-                'points_count': collection_info.points_count,
+                'points_count': count.count,
                 'vector_size': self.vector_size,
-                'distance': 'cosine'
+                'distance': 'cosine',
+                'quantization': 'int8' if self._collection_info.config.quantization_config else None
             }
         except Exception as e:
             logger.error(f"Failed to get collection stats: {e}")
@@ -215,9 +545,9 @@ class VectorDBPlugin(BasePlugin):
         if self.client:
             try:
                 # Get stats before closing
-                stats = self.get_collection_stats()
+                stats = await self.get_collection_stats()
                 if stats:
                     logger.info(f"Vector DB shutdown. Points stored: {stats['points_count']}")
-                self.client.close()
+                await self.client.close()
             except Exception as e:
                 logger.warning(f"Error during vector DB shutdown: {e}")
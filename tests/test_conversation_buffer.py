@@ -0,0 +1,29 @@
+"""Tests for the conversation buffer's recent-message retrieval"""
+
+import asyncio
+
+from src.plugins.storage.conversation_buffer import ConversationBufferPlugin
+
+
+def _retrieve_contents(count):
+    async def run():
+        buffer = ConversationBufferPlugin()
+        await buffer.initialize({'size': 10, 'path': ''})
+        for i in range(4):
+            await buffer.process(f"m{i}", {'message_type': 'user'})
+        result = await buffer.retrieve('q', {'count': count})
+        await buffer.shutdown()
+        return [m['content'] for m in result['recent_messages']]
+    
+    return asyncio.run(run())
+
+
+def test_retrieve_returns_the_last_count_messages_in_order():
+    assert _retrieve_contents(2) == ['m2', 'm3']
+    assert _retrieve_contents(10) == ['m0', 'm1', 'm2', 'm3']
+
+
+def test_retrieve_non_positive_count_keeps_slice_semantics():
+    # Same as messages[-count:]: 0 is the whole buffer, -1 drops the oldest
+    assert _retrieve_contents(0) == ['m0', 'm1', 'm2', 'm3']
+    assert _retrieve_contents(-1) == ['m1', 'm2', 'm3']
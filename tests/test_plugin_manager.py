@@ -0,0 +1,73 @@
+"""Tests for PluginManager's enabled-plugin cache and result handling"""
+
+import asyncio
+
+from src.core.plugin_manager import PluginManager
+from src.plugins.base_plugin import BasePlugin
+
+
+class _KeyPlugin(BasePlugin):
+    """Retrieval plugin returning {name: [name]}"""
+    
+    def __init__(self, name):
+        self._name = name
+    
+    @property
+    def name(self):
+        return self._name
+    
+    async def retrieve(self, query, context):
+        return {self._name: [self._name]}
+
+
+def test_empty_enabled_set_is_cached(monkeypatch):
+    manager = PluginManager()
+    refreshes = []
+    original_refresh = manager._refresh_enabled
+    monkeypatch.setattr(manager, '_refresh_enabled', lambda: refreshes.append(1) or original_refresh())
+    
+    async def run():
+        await manager.build_context('q', {})
+        await manager.build_context('q', {})
+    
+    asyncio.run(run())
+    
+    assert len(refreshes) == 1
+
+
+def test_set_enabled_rebuilds_the_enabled_cache():
+    manager = PluginManager()
+    
+    async def run():
+        await manager.register(_KeyPlugin('a'), {})
+        await manager.register(_KeyPlugin('b'), {})
+        both = dict(await manager.build_context('q', {}))
+        manager.set_enabled('a', False)
+        without_a = dict(await manager.build_context('q', {}))
+        manager.set_enabled('a', True)
+        again = dict(await manager.build_context('q', {}))
+        return both, without_a, again
+    
+    both, without_a, again = asyncio.run(run())
+    
+    assert set(both) == {'a', 'b'}
+    assert set(without_a) == {'b'}
+    assert set(again) == {'a', 'b'}
+
+
+class _CancelledPlugin(_KeyPlugin):
+    """Retrieval plugin whose task ends in CancelledError"""
+    
+    async def retrieve(self, query, context):
+        raise asyncio.CancelledError()
+
+
+def test_cancelled_plugin_is_skipped_not_merged():
+    manager = PluginManager()
+    
+    async def run():
+        await manager.register(_CancelledPlugin('cancelled'), {})
+        await manager.register(_KeyPlugin('ok'), {})
+        return dict(await manager.build_context('q', {}))
+    
+    assert asyncio.run(run()) == {'ok': ['ok']}
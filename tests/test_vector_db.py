@@ -0,0 +1,127 @@
+"""Tests for the vector DB plugin's semantic result cache"""
+
+import asyncio
+import zlib
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("qdrant_client")
+pytest.importorskip("sentence_transformers")
+
+from src.plugins.storage.vector_db import VectorDBPlugin
+
+
+class _StubEmbedder:
+    """Deterministic per-text vectors, counting encode calls"""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def _vector(self, text):
+        rng = np.random.default_rng(zlib.crc32(text.encode('utf-8')))
+        return rng.standard_normal(384).astype(np.float32)
+    
+    def encode(self, texts, normalize_embeddings=False, **kwargs):
+        self.calls += 1
+        if isinstance(texts, str):
+            vectors = self._vector(texts)
+        else:
+            vectors = np.stack([self._vector(t) for t in texts])
+        if normalize_embeddings:
+            vectors = vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors
+
+
+def test_filtered_and_unfiltered_searches_cached_separately(tmp_path, monkeypatch):
+    monkeypatch.setattr(VectorDBPlugin, '_load_embedder', lambda self: _StubEmbedder())
+    
+    async def run():
+        plugin = VectorDBPlugin()
+        await plugin.initialize({'path': str(tmp_path), 'semantic_cache_threshold': 0.97})
+        await plugin.process_batch([
+            ('hello', {'user_id': 'u', 'message_type': 'user'}),
+            ('hello', {'user_id': 'v', 'message_type': 'user'}),
+        ])
+        
+        misses = 0
+        original_query_points = plugin.client.query_points
+        
+        async def counting_query_points(*args, **kwargs):
+            nonlocal misses
+            misses += 1
+            return await original_query_points(*args, **kwargs)
+        
+        plugin.client.query_points = counting_query_points
+        
+        filtered = await plugin.retrieve('hello', {'user_id': 'u'})
+        unfiltered = [await plugin.retrieve('hello', {}) for _ in range(3)]
+        filtered_again = await plugin.retrieve('hello', {'user_id': 'u'})
+        
+        await plugin.shutdown()
+        return filtered, unfiltered, filtered_again, misses, plugin._result_entries
+    
+    filtered, unfiltered, filtered_again, misses, entries = asyncio.run(run())
+    
+    # One search per distinct (limit, filter); repeats come from the cache
+    assert misses == 2
+    assert [key for key, _ in entries] == [(5, (('user_id', 'u'),)), (5, ())]
+    assert {r['user_id'] for r in filtered['results']} == {'u'}
+    assert {r['user_id'] for r in filtered_again['results']} == {'u'}
+    for result in unfiltered:
+        assert {r['user_id'] for r in result['results']} == {'u', 'v'}
+
+
+def test_concurrent_retrievals_share_one_query_encode(tmp_path, monkeypatch):
+    embedder = _StubEmbedder()
+    monkeypatch.setattr(VectorDBPlugin, '_load_embedder', lambda self: embedder)
+    
+    async def run():
+        plugin = VectorDBPlugin()
+        await plugin.initialize({'path': str(tmp_path)})
+        await plugin.process('hello', {'user_id': 'u'})
+        calls_before = embedder.calls
+        
+        # As in PluginManager.build_context: vector_db and vector_search
+        # retrieve the same query at once
+        await asyncio.gather(
+            plugin.retrieve('hello', {}),
+            plugin.retrieve('hello', {'search_limit': 3}),
+        )
+        
+        await plugin.shutdown()
+        return embedder.calls - calls_before, plugin._pending_queries
+    
+    encodes, pending = asyncio.run(run())
+    
+    assert encodes == 1
+    assert pending == {}
+
+
+def test_vector_search_scopes_results_to_the_callers_user(tmp_path, monkeypatch):
+    from src.plugins.retrieval.vector_search import VectorSearchPlugin
+    
+    monkeypatch.setattr(VectorDBPlugin, '_load_embedder', lambda self: _StubEmbedder())
+    
+    async def run():
+        vector_db = VectorDBPlugin()
+        await vector_db.initialize({'path': str(tmp_path)})
+        await vector_db.process_batch([
+            ('hello', {'user_id': 'u', 'message_type': 'user'}),
+            ('hello', {'user_id': 'v', 'message_type': 'user'}),
+        ])
+        search = VectorSearchPlugin()
+        await search.initialize({'vector_db_plugin': vector_db})
+        
+        # As built by MessageProcessor.process_message
+        scoped = await search.retrieve('hello', {'query': 'hello', 'user_id': 'u'})
+        unscoped = await search.retrieve('hello', {'query': 'hello', 'user_id': None})
+        
+        await vector_db.shutdown()
+        return scoped, unscoped
+    
+    scoped, unscoped = asyncio.run(run())
+    
+    # Formatted results carry no user_id; the other user's copy is what is missing
+    assert [r['message'] for r in scoped['results']] == ['hello']
+    assert len(unscoped['results']) == 2